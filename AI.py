@@ -8,12 +8,26 @@
     Updated February 9, 2020
 """
 
-from copy import deepcopy
+import math
+import threading
+import time
+import BatchEvaluation as Be
 import Board as Bd
 import GameMechanics as Gme
+import MoveOrdering as Mo
+import Position as Ps
+import SearchStats as Ss
+import Tablebase as Tb
+import TranspositionTable as Tt
 
+# Half width of the first root window of the principal variation search (scores move about 0.01 between depths)
+ASPIRATION_WINDOW = 0.01
+# Bound of a negamax score seen from the other player
+OPPOSITE_BOUNDS = {Tt.EXACT: Tt.EXACT, Tt.LOWER_BOUND: Tt.UPPER_BOUND, Tt.UPPER_BOUND: Tt.LOWER_BOUND}
 
-def minimax(position: Bd, depth, max_player, game: Gme, alpha=float('-inf'), beta=float('inf')):
+
+def minimax(position: Bd, depth, max_player, game: Gme, alpha=float('-inf'), beta=float('inf'),
+            stats: Ss.SearchStats = None, ply=0):
     """
     Minimax algorithm with alpha beta pruning for the AI player
     :param position: current board position
@@ -22,21 +36,35 @@ def minimax(position: Bd, depth, max_player, game: Gme, alpha=float('-inf'), bet
     :param game: current game in play
     :param alpha: alpha value for pruning
     :param beta: beta value for pruning
-    :return: evaluation and best move
+    :param stats: optional statistics of the search
+    :param ply: distance from the root of the search
+    :return: evaluation and the position after the best move
     """
+    if stats is not None:
+        stats.count_node(ply)
     if depth == 0 or position.game_won() is not None:
-        return position.evaluate(), position
+        return evaluate(position, stats), None
+    elif depth == 1:
+        return minimax_last_ply(position, max_player, game, alpha, beta, stats, ply)
+
+    # Generated lazily: a cutoff also stops the move generation
+    moves = get_all_moves(position, max_player, game, stats)
+    if stats is not None:
+        stats.interior_nodes += 1
     if max_player == 1:
         max_evaluation = float('-inf')
         best_move = None
 
-        for move in get_all_moves(position, 1, game):
-            evaluation = minimax(move, depth - 1, 2, game, alpha, beta)[0]
+        for index, move in enumerate(moves):
+            evaluation = minimax(to_board(move, type(position), stats), depth - 1, 2, game, alpha, beta, stats,
+                                 ply + 1)[0]
             max_evaluation = max(max_evaluation, evaluation)
             if max_evaluation == evaluation:
                 best_move = move
             alpha = max(alpha, max_evaluation)
             if alpha >= beta:
+                if stats is not None:
+                    stats.count_cutoff(index)
                 break
         return max_evaluation, best_move
 
@@ -44,45 +72,624 @@ def minimax(position: Bd, depth, max_player, game: Gme, alpha=float('-inf'), bet
         min_evaluation = float('inf')
         best_move = None
 
-        for move in get_all_moves(position, 2, game):
-            evaluation = minimax(move, depth - 1, 1, game, alpha, beta)[0]
+        for index, move in enumerate(moves):
+            evaluation = minimax(to_board(move, type(position), stats), depth - 1, 1, game, alpha, beta, stats,
+                                 ply + 1)[0]
             min_evaluation = min(min_evaluation, evaluation)
             if min_evaluation == evaluation:
                 best_move = move
             beta = min(beta, min_evaluation)
             if alpha >= beta:
+                if stats is not None:
+                    stats.count_cutoff(index)
                 break
         return min_evaluation, best_move
 
 
-def get_all_moves(position, player, game: Gme):
+def minimax_last_ply(position: Bd, max_player, game: Gme, alpha, beta, stats: Ss.SearchStats = None, ply=0):
     """
-    Gets all the moves in a position
+    Last ply of minimax: scores all the moves with a single batched evaluation,
+    without building the position after every move
     :param position: current board position
+    :param max_player: player who is being analyzed
+    :param game: current game in play
+    :param alpha: alpha value for pruning
+    :param beta: beta value for pruning
+    :param stats: optional statistics of the search
+    :param ply: distance from the root of the search
+    :return: evaluation and the position after the best move
+    """
+    moves = generate_moves(position, max_player, stats)
+    evaluations = last_ply_evaluations(position, moves, max_player, stats)
+
+    best_evaluation = float('-inf') if max_player == 1 else float('inf')
+    best_index = None
+    for index, evaluation in enumerate(evaluations):
+        if stats is not None:
+            stats.count_node(ply + 1)
+        if max_player == 1:
+            best_evaluation = max(best_evaluation, evaluation)
+            alpha = max(alpha, best_evaluation)
+        else:
+            best_evaluation = min(best_evaluation, evaluation)
+            beta = min(beta, best_evaluation)
+        if best_evaluation == evaluation:
+            best_index = index
+        if alpha >= beta:
+            if stats is not None:
+                stats.count_cutoff(index)
+            break
+
+    if best_index is None:
+        return best_evaluation, None
+    initial_coordinate, final_coordinate = moves[best_index]
+    return best_evaluation, Ps.Position.from_board(position).apply(initial_coordinate, final_coordinate, max_player)
+
+
+def evaluate(position: Bd, stats: Ss.SearchStats = None, tablebase: Tb.Tablebase = None, player=None):
+    """
+    Evaluates a leaf of the search
+    :param position: board position
+    :param stats: optional statistics of the search, the evaluation time is added to them
+    :param tablebase: optional endgame tablebase, probed before the evaluation of the board
+    :param player: player who is going to move (needed with a tablebase)
+    :return: valuation
+    """
+    if stats is None:
+        return leaf_score(position, tablebase, player)
+    start = time.perf_counter()
+    evaluation = leaf_score(position, tablebase, player)
+    stats.evaluation_time += time.perf_counter() - start
+    return evaluation
+
+
+def leaf_score(position: Bd, tablebase: Tb.Tablebase, player):
+    """
+    Scores a leaf with the tablebase if the race to fill the goals is decided, else with the board evaluation
+    :param position: board position
+    :param tablebase: endgame tablebase or None
+    :param player: player who is going to move
+    :return: valuation
+    """
+    if tablebase is not None and position.game_won() is None:
+        score = tablebase.score(position, player)
+        if score is not None:
+            return score
+    return position.evaluate()
+
+
+def last_ply_evaluations(position: Bd, moves, player, stats: Ss.SearchStats = None):
+    """
+    Evaluates the positions after moves of the last ply with a single batched evaluation,
+    without making the moves
+    :param position: board position
+    :param moves: list of (initial coordinate, final coordinate) tuples
+    :param player: player who makes the moves
+    :param stats: optional statistics of the search, the evaluation time is added to them
+    :return: list with the valuation after every move
+    """
+    if stats is None:
+        return Be.evaluate_moves(position, moves, player)
+    start = time.perf_counter()
+    evaluations = Be.evaluate_moves(position, moves, player)
+    stats.evaluation_time += time.perf_counter() - start
+    return evaluations
+
+
+def generate_moves(position: Bd, player, stats: Ss.SearchStats = None):
+    """
+    Gets all the moves of a node of the search
+    :param position: board position
+    :param player: player who is going to move
+    :param stats: optional statistics of the search, the generated moves and the generation time are added to them
+    :return: list of (initial coordinate, final coordinate) tuples
+    """
+    if stats is None:
+        return get_move_list(position, player)
+    start = time.perf_counter()
+    moves = get_move_list(position, player)
+    stats.move_generation_time += time.perf_counter() - start
+    stats.count_moves(len(moves))
+    return moves
+
+
+def ordered_moves(position: Bd, player, ply, tt_move, pv, ordering: Mo.MoveOrdering, stats: Ss.SearchStats,
+                  tablebase: Tb.Tablebase, depth):
+    """
+    Gets the moves of a node of minimax_in_place or principal_variation_search in the order they are searched
+    :param position: board position
+    :param player: player who is going to move
+    :param ply: distance from the root of the search
+    :param tt_move: best move stored in the transposition table, or None
+    :param pv: principal variation of a previous search, or None
+    :param ordering: killer and history heuristics used to sort the moves, or None
+    :param stats: statistics of the search, or None
+    :param tablebase: endgame tablebase probed at the leaves, or None
+    :param depth: remaining depth of the node
+    :return: list of moves, and the LastPly scores of the children (None if they are searched one at a time)
+    """
+    moves = generate_moves(position, player, stats)
+    if ordering is not None:
+        ordering.order(moves, player, ply)
+    # Principal variation first, then the previous best move
+    for first_move in (tt_move, pv[0] if pv else None):
+        if first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+    # Leaves that can be in the tablebase are evaluated one at a time
+    if depth == 1 and (tablebase is None or not tablebase.in_reach(position)):
+        return moves, LastPly(position, moves, player, stats, ply)
+    return moves, None
+
+
+class LastPly:
+    """
+    Scores of the children of a node at depth 1. The first move nearly always cuts the node off,
+    so it is searched alone and the other moves are evaluated together only if it did not.
+    The children are leaves, their score does not depend on the window of the search
+    """
+    def __init__(self, position: Bd, moves, player, stats: Ss.SearchStats, ply):
+        """
+        Initializes the scores, nothing is evaluated yet
+        :param position: board position of the node (the same board must be in it when the scores are used)
+        :param moves: ordered moves of the node
+        :param player: player who makes the moves
+        :param stats: statistics of the search, or None
+        :param ply: distance of the node from the root of the search
+        """
+        self.position = position
+        self.moves = moves
+        self.player = player
+        self.stats = stats
+        self.ply = ply
+        self.evaluations = None
+
+    def score(self, index):
+        """
+        Gets the valuation after a move other than the first, evaluating all of them the first time
+        :param index: index of the move (1 or more)
+        :return: valuation (from player one)
+        """
+        if self.evaluations is None:
+            self.evaluations = last_ply_evaluations(self.position, self.moves[1:], self.player, self.stats)
+        if self.stats is not None:
+            self.stats.count_node(self.ply + 1)
+        return self.evaluations[index - 1]
+
+
+class SearchTimeout(Exception):
+    """
+    Raised when a search runs out of time
+    """
+
+
+def minimax_in_place(position: Bd, depth, max_player, game: Gme, alpha=float('-inf'), beta=float('inf'),
+                     table: Tt.TranspositionTable = None, deadline=None, cancelled: threading.Event = None,
+                     pv=None, ordering: Mo.MoveOrdering = None, stats: Ss.SearchStats = None,
+                     tablebase: Tb.Tablebase = None, ply=0):
+    """
+    Minimax algorithm with alpha beta pruning that walks the tree on a single board,
+    making and taking back each move instead of copying the board for every child.
+    At the last ply the moves are evaluated in a batch without making them (see LastPly)
+    :param position: current board position (restored before returning)
+    :param depth: maximum analysis depth
+    :param max_player: player who is being analyzed
+    :param game: current game in play
+    :param alpha: alpha value for pruning
+    :param beta: beta value for pruning
+    :param table: optional transposition table shared by the whole search
+    :param deadline: optional time.perf_counter() value after which SearchTimeout is raised
+    :param cancelled: optional event, SearchTimeout is raised once it is set
+    :param pv: optional principal variation of a previous search, searched first
+    :param ordering: optional killer and history heuristics used to sort the moves
+    :param stats: optional statistics of the search
+    :param tablebase: optional endgame tablebase probed at the leaves
+    :param ply: distance from the root of the search
+    :return: evaluation and best move as an (initial coordinate, final coordinate) tuple
+    """
+    if deadline is not None and time.perf_counter() > deadline or cancelled is not None and cancelled.is_set():
+        raise SearchTimeout()
+    if stats is not None:
+        stats.count_node(ply)
+    if depth == 0 or position.game_won() is not None:
+        return evaluate(position, stats, tablebase, max_player), None
+
+    tt_move = None
+    if table is not None:
+        key = position.hash_key ^ Bd.ZOBRIST_TURN[max_player]
+        entry = table.probe(key)
+        if stats is not None:
+            stats.count_probe(entry is not None)
+        if entry is not None:
+            if entry.depth >= depth:
+                if entry.bound == Tt.EXACT:
+                    return entry.score, entry.best_move
+                elif entry.bound == Tt.LOWER_BOUND:
+                    alpha = max(alpha, entry.score)
+                else:
+                    beta = min(beta, entry.score)
+                if alpha >= beta:
+                    return entry.score, entry.best_move
+            tt_move = entry.best_move
+        original_alpha, original_beta = alpha, beta
+
+    moves, last_ply = ordered_moves(position, max_player, ply, tt_move, pv, ordering, stats, tablebase, depth)
+
+    if max_player == 1:
+        max_evaluation = float('-inf')
+        best_move = None
+
+        for index, move in enumerate(moves):
+            if last_ply is not None and index > 0:
+                evaluation = last_ply.score(index)
+            else:
+                child_pv = pv[1:] if pv and move == pv[0] else None
+                undo = apply_move(position, move, 1, stats)
+                try:
+                    evaluation = minimax_in_place(position, depth - 1, 2, game, alpha, beta, table, deadline,
+                                                  cancelled, child_pv, ordering, stats, tablebase, ply + 1)[0]
+                finally:
+                    undo_move(position, undo, stats)
+            max_evaluation = max(max_evaluation, evaluation)
+            if max_evaluation == evaluation:
+                best_move = move
+            alpha = max(alpha, max_evaluation)
+            if alpha >= beta:
+                if ordering is not None:
+                    ordering.record_cutoff(move, 1, ply, depth)
+                if stats is not None:
+                    stats.count_cutoff(index)
+                break
+        best_evaluation = max_evaluation
+
+    else:
+        min_evaluation = float('inf')
+        best_move = None
+
+        for index, move in enumerate(moves):
+            if last_ply is not None and index > 0:
+                evaluation = last_ply.score(index)
+            else:
+                child_pv = pv[1:] if pv and move == pv[0] else None
+                undo = apply_move(position, move, 2, stats)
+                try:
+                    evaluation = minimax_in_place(position, depth - 1, 1, game, alpha, beta, table, deadline,
+                                                  cancelled, child_pv, ordering, stats, tablebase, ply + 1)[0]
+                finally:
+                    undo_move(position, undo, stats)
+            min_evaluation = min(min_evaluation, evaluation)
+            if min_evaluation == evaluation:
+                best_move = move
+            beta = min(beta, min_evaluation)
+            if alpha >= beta:
+                if ordering is not None:
+                    ordering.record_cutoff(move, 2, ply, depth)
+                if stats is not None:
+                    stats.count_cutoff(index)
+                break
+        best_evaluation = min_evaluation
+
+    if table is not None:
+        if best_evaluation <= original_alpha:
+            bound = Tt.UPPER_BOUND
+        elif best_evaluation >= original_beta:
+            bound = Tt.LOWER_BOUND
+        else:
+            bound = Tt.EXACT
+        table.store(key, depth, best_evaluation, bound, best_move)
+    return best_evaluation, best_move
+
+
+def principal_variation_search(position: Bd, depth, player, game: Gme, alpha=float('-inf'), beta=float('inf'),
+                               table: Tt.TranspositionTable = None, deadline=None,
+                               cancelled: threading.Event = None, pv=None, ordering: Mo.MoveOrdering = None,
+                               stats: Ss.SearchStats = None, tablebase: Tb.Tablebase = None, ply=0):
+    """
+    Negamax principal variation search on a single board. The first move is searched with the full window
+    and the others with a null window, which only proves that they are not better; a move that is
+    better is searched again with the full window.
+    Scores are seen from the player to move, the transposition table keeps them from player one
+    like minimax_in_place, so both searches can share a table
+    :param position: current board position (restored before returning)
+    :param depth: maximum analysis depth
     :param player: player who is going to move
     :param game: current game in play
-    :return: a list of all the boards with the new moves
+    :param alpha: alpha value for pruning (for the player to move)
+    :param beta: beta value for pruning (for the player to move)
+    :param table: optional transposition table shared by the whole search
+    :param deadline: optional time.perf_counter() value after which SearchTimeout is raised
+    :param cancelled: optional event, SearchTimeout is raised once it is set
+    :param pv: optional principal variation of a previous search, searched first
+    :param ordering: optional killer and history heuristics used to sort the moves
+    :param stats: optional statistics of the search
+    :param tablebase: optional endgame tablebase probed at the leaves
+    :param ply: distance from the root of the search
+    :return: evaluation for the player to move and the principal variation (list of moves)
+    """
+    if deadline is not None and time.perf_counter() > deadline or cancelled is not None and cancelled.is_set():
+        raise SearchTimeout()
+    if stats is not None:
+        stats.count_node(ply)
+    sign = 1 if player == 1 else -1
+    if depth == 0 or position.game_won() is not None:
+        return sign * evaluate(position, stats, tablebase, player), []
+
+    tt_move = None
+    if table is not None:
+        key = position.hash_key ^ Bd.ZOBRIST_TURN[player]
+        entry = table.probe(key)
+        if stats is not None:
+            stats.count_probe(entry is not None)
+        # Nodes searched with a full window do not stop at the table so their whole variation is known
+        if entry is not None:
+            if entry.depth >= depth and beta <= null_window(alpha):
+                score = sign * entry.score
+                bound = entry.bound if sign == 1 else OPPOSITE_BOUNDS[entry.bound]
+                if bound == Tt.EXACT or bound == Tt.LOWER_BOUND and score >= beta or \
+                        bound == Tt.UPPER_BOUND and score <= alpha:
+                    return score, [entry.best_move] if entry.best_move is not None else []
+            tt_move = entry.best_move
+        original_alpha = alpha
+
+    moves, last_ply = ordered_moves(position, player, ply, tt_move, pv, ordering, stats, tablebase, depth)
+
+    best_score = float('-inf')
+    best_variation = []
+    for index, move in enumerate(moves):
+        if last_ply is not None and index > 0:
+            score, variation = sign * last_ply.score(index), []
+        else:
+            child_pv = pv[1:] if pv and move == pv[0] else None
+            undo = apply_move(position, move, player, stats)
+            try:
+                if index == 0:
+                    score, variation = principal_variation_search(position, depth - 1, 3 - player, game, -beta,
+                                                                  -alpha, table, deadline, cancelled, child_pv,
+                                                                  ordering, stats, tablebase, ply + 1)
+                    score = -score
+                else:
+                    score, variation = principal_variation_search(position, depth - 1, 3 - player, game,
+                                                                  -null_window(alpha), -alpha, table, deadline,
+                                                                  cancelled, child_pv, ordering, stats, tablebase,
+                                                                  ply + 1)
+                    score = -score
+                    if alpha < score < beta:
+                        score, variation = principal_variation_search(position, depth - 1, 3 - player, game, -beta,
+                                                                      -alpha, table, deadline, cancelled, child_pv,
+                                                                      ordering, stats, tablebase, ply + 1)
+                        score = -score
+            finally:
+                undo_move(position, undo, stats)
+
+        if not best_variation or score > best_score:
+            best_score = score
+            best_variation = [move] + variation
+        alpha = max(alpha, score)
+        if alpha >= beta:
+            if ordering is not None:
+                ordering.record_cutoff(move, player, ply, depth)
+            if stats is not None:
+                stats.count_cutoff(index)
+            break
+
+    if table is not None:
+        if best_score <= original_alpha:
+            bound = Tt.UPPER_BOUND
+        elif best_score >= beta:
+            bound = Tt.LOWER_BOUND
+        else:
+            bound = Tt.EXACT
+        table.store(key, depth, sign * best_score, bound if sign == 1 else OPPOSITE_BOUNDS[bound],
+                    best_variation[0] if best_variation else None)
+    return best_score, best_variation
+
+
+def null_window(alpha):
+    """
+    Gets the beta of a null window search: the next score above alpha
+    :param alpha: alpha value
+    :return: beta value
+    """
+    return math.nextafter(alpha, float('inf'))
+
+
+def aspiration_search(position: Bd, depth, max_player, game: Gme, guess=None, table: Tt.TranspositionTable = None,
+                      deadline=None, cancelled: threading.Event = None, pv=None, ordering: Mo.MoveOrdering = None,
+                      stats: Ss.SearchStats = None, tablebase: Tb.Tablebase = None):
+    """
+    Principal variation search of the root with a narrow window around the expected score.
+    If the score falls outside of it, that side of the window is opened and the root is searched again
+    :param position: current board position (restored before returning)
+    :param depth: maximum analysis depth
+    :param max_player: player who is being analyzed
+    :param game: current game in play
+    :param guess: expected evaluation (score of the previous iteration), or None to search with the full window
+    :param table: optional transposition table shared by the whole search
+    :param deadline: optional time.perf_counter() value after which SearchTimeout is raised
+    :param cancelled: optional event, SearchTimeout is raised once it is set
+    :param pv: optional principal variation of a previous search, searched first
+    :param ordering: optional killer and history heuristics used to sort the moves
+    :param stats: optional statistics of the search
+    :param tablebase: optional endgame tablebase probed at the leaves
+    :return: evaluation (from player one like minimax_in_place) and principal variation
+    """
+    sign = 1 if max_player == 1 else -1
+    alpha, beta = float('-inf'), float('inf')
+    if guess is not None and not math.isinf(guess):
+        alpha, beta = sign * guess - ASPIRATION_WINDOW, sign * guess + ASPIRATION_WINDOW
+
+    while True:
+        score, variation = principal_variation_search(position, depth, max_player, game, alpha, beta, table,
+                                                      deadline, cancelled, pv, ordering, stats, tablebase)
+        if score <= alpha and not math.isinf(alpha):
+            alpha = float('-inf')
+        elif score >= beta and not math.isinf(beta):
+            beta = float('inf')
+        else:
+            return sign * score, variation
+
+
+def apply_move(position: Bd, move, player, stats: Ss.SearchStats = None):
+    """
+    Makes a move of the search on the board
+    :param position: board position
+    :param move: (initial coordinate, final coordinate) tuple
+    :param player: player who makes the move
+    :param stats: optional statistics of the search, the time is added to them
+    :return: undo information for undo_move
+    """
+    if stats is None:
+        return position.apply_move(move[0], move[1], player)
+    start = time.perf_counter()
+    undo = position.apply_move(move[0], move[1], player)
+    stats.make_move_time += time.perf_counter() - start
+    return undo
+
+
+def undo_move(position: Bd, undo, stats: Ss.SearchStats = None):
+    """
+    Takes back a move of the search
+    :param position: board position
+    :param undo: undo information returned by apply_move
+    :param stats: optional statistics of the search, the time is added to them
+    """
+    if stats is None:
+        position.undo_move(undo)
+        return
+    start = time.perf_counter()
+    position.undo_move(undo)
+    stats.make_move_time += time.perf_counter() - start
+
+
+def iterative_deepening(position: Bd, max_player, game: Gme, time_budget, max_depth=20,
+                        table: Tt.TranspositionTable = None, ordering: Mo.MoveOrdering = None,
+                        stats: Ss.SearchStats = None, tablebase: Tb.Tablebase = None, pvs=False,
+                        cancelled: threading.Event = None):
+    """
+    Searches one ply deeper each iteration until the time budget runs out.
+    The first iteration always finishes so there is always a move to play
+    :param position: current board position (restored before returning)
+    :param max_player: player who is being analyzed
+    :param game: current game in play
+    :param time_budget: time budget in milliseconds
+    :param max_depth: maximum analysis depth
+    :param table: optional transposition table (a new one is used if not given)
+    :param ordering: optional move ordering heuristics (new ones are used if not given)
+    :param stats: optional statistics of the search
+    :param tablebase: optional endgame tablebase probed at the leaves
+    :param pvs: use the principal variation search with aspiration windows instead of minimax_in_place
+    :param cancelled: optional event that stops the search once it is set (also during the first iteration)
+    :return: evaluation, best move and depth of the deepest finished iteration
+    """
+    deadline = time.perf_counter() + time_budget / 1000
+    if table is None:
+        table = Tt.TranspositionTable()
+    table.new_search()
+    if ordering is None:
+        ordering = Mo.MoveOrdering()
+    ordering.new_search()
+
+    result = position.evaluate(), None, 0
+    pv = []
+    for depth in range(1, max_depth + 1):
+        try:
+            if pvs:
+                evaluation, pv = aspiration_search(position, depth, max_player, game, result[0] if depth > 1 else None,
+                                                   table, deadline if depth > 1 else None, cancelled, pv, ordering,
+                                                   stats, tablebase)
+                best_move = pv[0] if pv else None
+            else:
+                evaluation, best_move = minimax_in_place(position, depth, max_player, game, table=table,
+                                                         deadline=deadline if depth > 1 else None,
+                                                         cancelled=cancelled, pv=pv,
+                                                         ordering=ordering, stats=stats, tablebase=tablebase)
+        except SearchTimeout:
+            break
+
+        result = evaluation, best_move, depth
+        if not pvs:
+            pv = get_principal_variation(position, max_player, table, depth)
+        # The game is decided, searching deeper does not change the move
+        if evaluation in (float('inf'), float('-inf')) or time.perf_counter() > deadline:
+            break
+    return result
+
+
+def get_principal_variation(position: Bd, max_player, table: Tt.TranspositionTable, depth):
+    """
+    Follows the best moves stored in the transposition table
+    :param position: current board position (restored before returning)
+    :param max_player: player who moves first
+    :param table: transposition table of the search
+    :param depth: maximum length of the variation
+    :return: list with the moves of the principal variation
+    """
+    pv = []
+    undos = []
+    player = max_player
+    for _ in range(depth):
+        entry = table.peek(position.hash_key ^ Bd.ZOBRIST_TURN[player])
+        if entry is None or entry.best_move is None:
+            break
+        pv.append(entry.best_move)
+        undos.append(position.apply_move(entry.best_move[0], entry.best_move[1], player))
+        player = 3 - player
+
+    for undo in reversed(undos):
+        position.undo_move(undo)
+    return pv
+
+
+def get_move_list(position, player):
+    """
+    Gets all the moves in a position as lightweight tuples
+    :param position: current board position
+    :param player: player who is going to move
+    :return: list of (initial coordinate, final coordinate) tuples
     """
     moves = []
     for piece in position.get_pieces(player):
-        valid_moves = position.get_valid_moves(piece)
-        for move in valid_moves:
-            temp_board = deepcopy(position)
-            new_board = simulate_move(piece, move, temp_board, game, player)
-            moves.append(new_board)
+        piece = (piece[0], piece[1])
+        for move in position.get_valid_moves(piece):
+            moves.append((piece, (move[0], move[1])))
     return moves
 
 
-def simulate_move(piece, move, board, game, player):
+def get_all_moves(position, player, game: Gme, stats: Ss.SearchStats = None):
     """
-    Simulates a move on one of the analysis boards
-    :param piece: current piece to be moved
-    :param move: move to be made
-    :param board: board in which the move will be made
+    Gets all the moves in a position, one at a time. The moves of a piece are only
+    searched when the moves of the previous pieces have been used
+    :param position: current board position (must not change while the moves are used)
+    :param player: player who is going to move
     :param game: current game in play
-    :param player: player who has to move
-    :return: board with the move
+    :param stats: optional statistics of the search, the generated moves and the generation time are added to them
+    :return: generator with the compact position after every move
+    """
+    root = Ps.Position.from_board(position)
+    for piece in position.get_pieces(player):
+        if stats is None:
+            valid_moves = position.get_valid_moves(piece)
+        else:
+            start = time.perf_counter()
+            valid_moves = position.get_valid_moves(piece)
+            stats.move_generation_time += time.perf_counter() - start
+            stats.moves_generated += len(valid_moves)
+        for move in valid_moves:
+            yield root.apply(piece, move, player)
+
+
+def to_board(position: Ps.Position, board_class, stats: Ss.SearchStats = None):
+    """
+    Builds the board of a position returned by get_all_moves
+    :param position: compact position
+    :param board_class: board backend
+    :param stats: optional statistics of the search, the time is added to the copy time
+    :return: the board
     """
-    board.direct_move(piece, move, player)
+    if stats is None:
+        return position.to_board(board_class)
+    start = time.perf_counter()
+    board = position.to_board(board_class)
+    stats.copy_time += time.perf_counter() - start
     return board
 
@@ -0,0 +1,118 @@
+"""
+    AIWorker.py
+
+    Runs the AI search in a background thread so the
+    game window keeps drawing while the AI thinks
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+import queue
+import threading
+import traceback
+import AI as AI
+import BitBoard as Bb
+import MoveOrdering as Mo
+import OpeningBook as Ob
+import Position as Ps
+import SearchStats as Ss
+import Tablebase as Tb
+import TranspositionTable as Tt
+
+
+class AIWorker:
+    """
+    Background AI search on a snapshot of the board.
+    Every search gets an id, results of cancelled or older searches are discarded.
+    Cancelling a search, or starting a new one, also stops the old search at its next node
+    Every search puts a result, also when it fails or finds no move, so the game never waits forever
+    """
+    def __init__(self, table: Tt.TranspositionTable = None, book: Ob.OpeningBook = None,
+                 tablebase: Tb.Tablebase = None):
+        """
+        Initializes the worker
+        :param table: transposition table shared by the searches (its entries are replaced atomically)
+        :param book: optional opening book, looked up before searching
+        :param tablebase: optional endgame tablebase, probed at the leaves of the searches
+        """
+        self.table = table if table is not None else Tt.TranspositionTable()
+        self.book = book
+        self.tablebase = tablebase
+        self.results = queue.Queue()
+        self.search_id = 0
+        self.thinking = False
+        # Set to stop the current search
+        self.cancelled = threading.Event()
+
+    def start(self, board, player, time_budget):
+        """
+        Starts searching a move for a player
+        :param board: current board of any backend (a BitBoard snapshot is searched, the board can keep changing)
+        :param player: player who is going to move
+        :param time_budget: time the AI can think in milliseconds
+        """
+        self.cancelled.set()
+        self.cancelled = threading.Event()
+        self.search_id += 1
+        self.thinking = True
+        # The fastest backend is searched whatever board the game uses
+        snapshot = Ps.Position.from_board(board).to_board(Bb.BitBoard)
+        thread = threading.Thread(target=self.search, args=(self.search_id, snapshot, player, time_budget,
+                                                            self.cancelled), daemon=True)
+        thread.start()
+
+    def search(self, search_id, board, player, time_budget, cancelled):
+        """
+        Searches a move (runs in the background thread)
+        :param search_id: id of the search
+        :param board: snapshot of the board
+        :param player: player who is going to move
+        :param time_budget: time the AI can think in milliseconds
+        :param cancelled: event set when the search is cancelled
+        """
+        stats = Ss.SearchStats()
+        try:
+            book_entry = self.book.lookup(board, player) if self.book is not None else None
+            if book_entry is not None:
+                move, score = book_entry
+                result = score, move, 0
+            else:
+                # Own move ordering: a cancelled search may still be running next to the new one
+                result = AI.iterative_deepening(board, player, None, time_budget, table=self.table,
+                                                ordering=Mo.MoveOrdering(), stats=stats, tablebase=self.tablebase,
+                                                pvs=True, cancelled=cancelled)
+            score, move, depth = result
+            if move is None:
+                self.results.put((search_id, None, stats, None))
+                return
+            # The path is found here so the game can make the move without searching it
+            self.results.put((search_id, (score, board.get_move_record(move[0], move[1]), depth), stats, None))
+        except Exception as error:
+            traceback.print_exc()
+            self.results.put((search_id, None, stats, error))
+
+    def cancel(self):
+        """
+        Cancels the current search: it stops at its next node and its result will be ignored
+        """
+        self.cancelled.set()
+        self.search_id += 1
+        self.thinking = False
+
+    def get_result(self):
+        """
+        Gets the result of the current search without waiting
+        :return: evaluation, MoveRecord of the best move and depth (0 for book moves) (None if the search failed
+                 or found no move), the search statistics and the error of the search (None if it did not fail),
+                 or None if it has not finished
+        """
+        while True:
+            try:
+                search_id, result, stats, error = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if search_id == self.search_id and self.thinking:
+                self.thinking = False
+                return result, stats, error
@@ -11,35 +11,102 @@
 
     Click   -   Select initial and final square for the hopper
     Space   -   Reset the selected coordinates
+    R       -   Restart the game (also while the AI is thinking)
+
+    Usage:
+
+    python AlphaHoppersMain.py
+    python AlphaHoppersMain.py --record games.jsonl
 """
 
+import argparse
+import os
 import GameMechanics as Mechanics
-import AI as AI
+import GameRecord as Gr
+import AIWorker as Worker
+import OpeningBook as Ob
+import Tablebase as Tb
 import pygame as p
 
-hopper_engine = Mechanics.Hoppers()
-hopper_engine.get_board().print_board()
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+TABLEBASE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "endgame_tablebase.bin")
+
+# Created by start_game, so importing this module has no side effects
+hopper_engine = None
+ai_worker = None
 
-p.init()
 WIDTH = HEIGHT = 520
 DIMENSION = 10
 SQ_SIZE = HEIGHT // DIMENSION
 MAX_FPS = 144
+AI_TIME_BUDGET = 1000  # milliseconds
 COLORS = {1: [p.Color("yellowgreen"), SQ_SIZE], 2: [p.Color("cyan"), SQ_SIZE]}
-FONT = p.font.SysFont("Arial", 45)
-SMALL_FONT = p.font.SysFont("Arial", 20)
+FONT_SIZE = 45
+SMALL_FONT_SIZE = 20
+# Fonts by size, loaded the first time they are used
+fonts = {}
 """
 User input and updating the graphics
 """
 
 
+def start_game(record_file=None):
+    """
+    Creates the game and the AI worker and starts pygame
+    :param record_file: optional game record file the games are appended to (.gz to compress)
+    :return: the window
+    """
+    global hopper_engine, ai_worker
+    writer = None
+    if record_file is not None:
+        writer = Gr.GameWriter(Gr.open_archive(record_file, "a"), {"player_one": "human", "player_two": "ai"})
+    hopper_engine = Mechanics.Hoppers(writer=writer)
+    ai_worker = Worker.AIWorker(book=Ob.OpeningBook.load(BOOK_FILE) if os.path.exists(BOOK_FILE) else None,
+                                tablebase=Tb.Tablebase(TABLEBASE_FILE) if os.path.exists(TABLEBASE_FILE) else None)
+    hopper_engine.get_board().print_board()
+
+    p.init()
+    return p.display.set_mode((WIDTH, HEIGHT))
+
+
+def get_font(size):
+    """
+    Gets the Arial font of a size, looking it up only the first time
+    :param size: font size
+    :return: the font
+    """
+    if size not in fonts:
+        fonts[size] = p.font.SysFont("Arial", size)
+    return fonts[size]
+
+
 def main():
     """
     Main method to run the Hoppers game
     """
-    screen = p.display.set_mode((WIDTH, HEIGHT))
+    parser = argparse.ArgumentParser(description="Plays Hoppers against the AI")
+    parser.add_argument("--record", default=None, help="game record file the games are appended to (.gz to compress)")
+    arguments = parser.parse_args()
+
+    screen = start_game(arguments.record)
+    try:
+        play(screen)
+    finally:
+        ai_worker.cancel()
+        if hopper_engine.writer is not None:
+            if hopper_engine.writer.moves:
+                hopper_engine.writer.finish_game(None)
+            hopper_engine.writer.file.close()
+
+
+def play(screen):
+    """
+    Runs the game loop until the window is closed
+    :param screen: the window
+    """
     clock = p.time.Clock()
     screen.fill(p.Color("white"))
+    renderer = BoardRenderer()
     winner = None
     current_selection = []
     ai_turn = False
@@ -64,24 +131,43 @@ def main():
                     current_selection.clear()
 
             elif e.type == p.MOUSEBUTTONUP:
-                if ai_turn:
-                    winner = make_ai_move(2, 1)
-                    ai_turn = False
+                if ai_turn and winner is None and not ai_worker.thinking:
+                    ai_worker.start(hopper_engine.get_board(), 2, AI_TIME_BUDGET)
 
             elif e.type == p.KEYDOWN:
                 if e.key == p.K_SPACE:
                     current_selection.clear()
+                elif e.key == p.K_r:
+                    ai_worker.cancel()
+                    hopper_engine.restart()
+                    current_selection.clear()
+                    ai_turn = False
+
+        result = ai_worker.get_result()
+        if result is not None:
+            search_result, stats, error = result
+            if search_result is not None:
+                winner = make_ai_move(2, search_result, stats)
+            elif error is not None:
+                print(f"La IA no pudo buscar un movimiento: {error}")
+            else:
+                print("La IA no tiene movimientos")
+            ai_turn = False
+
         if len(current_selection) > 0:
-            draw_game(screen, hopper_engine, current_selection[0])
+            dirty_rects = renderer.draw(screen, hopper_engine, current_selection[0], ai_worker.thinking)
         else:
-            draw_game(screen, hopper_engine)
+            dirty_rects = renderer.draw(screen, hopper_engine, thinking=ai_worker.thinking)
         clock.tick(MAX_FPS)
-        p.display.flip()
+        if dirty_rects:
+            p.display.update(dirty_rects)
 
         if winner is not None and winner != -1:
             print(f"Gano el jugador {winner}")
             game_playing = initialize_game(screen, winner)
+            renderer.invalidate()
             winner = None
+            ai_turn = False
 
 
 def initialize_game(screen, winner):
@@ -90,8 +176,8 @@ def initialize_game(screen, winner):
     :return: hoppers game
     """
     game_over = True
-    game_won = FONT.render(f"¡Ganó el jugador {winner}!", True, p.Color("black"))
-    restart = SMALL_FONT.render("Presione enter para jugar de nuevo", True, p.Color("black"))
+    game_won = get_font(FONT_SIZE).render(f"¡Ganó el jugador {winner}!", True, p.Color("black"))
+    restart = get_font(SMALL_FONT_SIZE).render("Presione enter para jugar de nuevo", True, p.Color("black"))
     screen.blit(game_won, (WIDTH//7, HEIGHT//2.5))
     screen.blit(restart, (WIDTH//5, HEIGHT//2))
     p.display.flip()
@@ -107,19 +193,130 @@ def initialize_game(screen, winner):
                     game_over = False
                     break
 
+    ai_worker.cancel()
     hopper_engine.restart()
     return True
 
 
-def draw_game(screen, game, selected_piece=None):
+class BoardRenderer:
     """
-    Draws the game in the window
-    :param selected_piece:
-    :param screen: screen to draw on
+    Draws the game redrawing only the squares that changed since the last frame.
+    The checkerboard and zones are rendered once into a cached background
+    """
+    def __init__(self):
+        """
+        Initializes the renderer
+        """
+        self.background = None
+        self.thinking_text = None
+        self.drawn_squares = {}
+        self.drawn_state = None
+        self.thinking_drawn = False
+        self.full_redraw = True
+
+    def invalidate(self):
+        """
+        Forces the next frame to redraw the whole window (after something else drew on the screen)
+        """
+        self.full_redraw = True
+
+    def draw(self, screen, game, selected_piece=None, thinking=False):
+        """
+        Draws the changes of the game in the window
+        :param screen: screen to draw on
+        :param game: game that is being played
+        :param selected_piece: selected piece
+        :param thinking: if the AI is thinking
+        :return: list with the rectangles that changed (empty if nothing changed)
+        """
+        state = (game.get_board().hash_key, tuple(selected_piece) if selected_piece is not None else None, thinking)
+        if state == self.drawn_state and not self.full_redraw:
+            return []
+        self.drawn_state = state
+
+        if self.background is None:
+            self.background = p.Surface((WIDTH, HEIGHT))
+            draw_board(self.background, game)
+            self.thinking_text = get_font(SMALL_FONT_SIZE).render("Pensando...", True, p.Color("black"),
+                                                                  p.Color("white"))
+        thinking_rect = self.thinking_text.get_rect(bottomright=(WIDTH - 5, HEIGHT - 5))
+
+        if self.full_redraw or thinking != self.thinking_drawn:
+            # Forget the squares under the indicator (or all of them) so they are drawn again
+            for square in list(self.drawn_squares):
+                if self.full_redraw or square_rect(*square).colliderect(thinking_rect):
+                    del self.drawn_squares[square]
+
+        dirty_rects = []
+        for square, content in get_square_contents(game, selected_piece).items():
+            if self.drawn_squares.get(square) != content:
+                dirty_rects.append(draw_square(screen, self.background, square, content))
+                self.drawn_squares[square] = content
+
+        if thinking and (thinking != self.thinking_drawn or thinking_rect.collidelist(dirty_rects) != -1):
+            screen.blit(self.thinking_text, thinking_rect)
+            dirty_rects.append(thinking_rect)
+        self.thinking_drawn = thinking
+
+        if self.full_redraw:
+            self.full_redraw = False
+            return [screen.get_rect()]
+        return dirty_rects
+
+
+def get_square_contents(game, highlighted=None):
+    """
+    Gets what has to be drawn on every square
     :param game: game that is being played
+    :param highlighted: highlighted piece
+    :return: dictionary with the content of every square: 0, the player, "highlighted" or "move"
+    """
+    board = game.get_board().board
+    contents = {}
+    for row in range(DIMENSION):
+        for column in range(DIMENSION):
+            contents[(row, column)] = board[row][column]
+
+    if highlighted is not None and board[highlighted[0]][highlighted[1]] != 0:
+        contents[(highlighted[0], highlighted[1])] = "highlighted"
+        for row, column in game.get_possible_moves(highlighted):
+            contents[(row, column)] = "move"
+    return contents
+
+
+def square_rect(row, column):
+    """
+    Gets the rectangle of a square in the window
+    :param row: row of the square
+    :param column: column of the square
+    :return: the rectangle
     """
-    draw_board(screen, game)  # squares on the board
-    draw_pieces(screen, game.get_board().board, selected_piece)   # pieces
+    return p.Rect(column * SQ_SIZE, row * SQ_SIZE, SQ_SIZE, SQ_SIZE)
+
+
+def draw_square(screen, background, square, content):
+    """
+    Draws a square and its piece
+    :param screen: screen to draw on
+    :param background: pre-rendered board
+    :param square: (row, column) of the square
+    :param content: content of the square (see get_square_contents)
+    :return: the rectangle that was drawn
+    """
+    row, column = square
+    rect = square_rect(row, column)
+    screen.blit(background, rect, rect)
+    if content == "highlighted":
+        color = p.Color("yellow")
+    elif content == "move":
+        color = p.Color("darkgray")
+    elif content != 0:
+        color = COLORS[content][0]
+    else:
+        return rect
+
+    p.draw.circle(screen, color, (column * SQ_SIZE + SQ_SIZE / 2, row * SQ_SIZE + SQ_SIZE / 2), SQ_SIZE / 3.2)
+    return rect
 
 
 def draw_board(screen, game):
@@ -143,34 +340,6 @@ def draw_board(screen, game):
             p.draw.rect(screen, color, p.Rect(column * SQ_SIZE, row * SQ_SIZE, SQ_SIZE, SQ_SIZE))
 
 
-def draw_pieces(screen, board, highlighted=None):
-    """
-    Draws the hopper pieces
-    :param highlighted: highlighted piece
-    :param screen: screen to draw on
-    :param board: Hoppers board
-    """
-    for row in range(DIMENSION):
-        for column in range(DIMENSION):
-            piece = board[row][column]
-            if piece == 0:
-                continue
-            elif [row, column] == highlighted:
-                p.draw.circle(screen, p.Color("yellow"), (column * SQ_SIZE + SQ_SIZE / 2, row * SQ_SIZE + SQ_SIZE / 2),
-                              SQ_SIZE / 3.2)
-                draw_possible_moves(screen, highlighted)
-            else:
-                p.draw.circle(screen, COLORS[piece][0], (column * SQ_SIZE + SQ_SIZE / 2, row * SQ_SIZE + SQ_SIZE / 2),
-                              SQ_SIZE / 3.2)
-
-
-def draw_possible_moves(screen, piece):
-    moves = hopper_engine.get_possible_moves(piece)
-    for row, column in moves:
-        p.draw.circle(screen, p.Color("darkgray"), (column * SQ_SIZE + SQ_SIZE / 2, row * SQ_SIZE + SQ_SIZE / 2),
-                      SQ_SIZE / 3.2)
-
-
 def make_human_move(player, move):
     """
     Processes human input and makes a move
@@ -197,23 +366,25 @@ def make_human_move(player, move):
     return winner, valid_movement
 
 
-def make_ai_move(player, depth):
+def make_ai_move(player, search_result, stats):
     """
-    Makes an AI move
+    Makes the move found by the AI worker
     :param player: player one or two
-    :param depth: depth of the AI analysis
+    :param search_result: evaluation, MoveRecord of the best move and depth of the search
+    :param stats: statistics of the search
     :return: if there is a game winner
     """
-    value, new_board = AI.minimax(hopper_engine.get_board(), depth, player, hopper_engine)
-
-    move = new_board.get_last_move()
-    initial_row, initial_column = move[0][0], move[0][1]
-    final_row, final_column = move[1][0], move[1][1]
+    value, move, depth = search_result
 
-    path = hopper_engine.make_move([initial_row, initial_column], [final_row, final_column], player)[1]
+    path = hopper_engine.apply_move(move, player)
     winner = hopper_engine.check_win()
 
-    print(new_board.evaluate(), "Evaluacion actual")
+    print(hopper_engine.get_board().evaluate(), "Evaluacion actual")
+    if depth == 0:
+        print("Movimiento del libro de aperturas")
+    else:
+        print(depth, "profundidad")
+        stats.dump()
     print(path, "recorrido\n")
     hopper_engine.get_board().print_board()
 
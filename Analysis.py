@@ -0,0 +1,149 @@
+"""
+    Analysis.py
+
+    Scores large sets of positions at a fixed depth with a pool of processes.
+    Positions are sent in chunks, only a few chunks are in flight at a time,
+    and the results come back in the order of the positions
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+
+    Usage:
+
+    python Analysis.py games.jsonl.gz --depth 3 --workers 4 --output analysis.jsonl
+"""
+
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import argparse
+import json
+import math
+import os
+import time
+import AI as AI
+import BitBoard as Bb
+import GameRecord as Gr
+import ParallelSearch as Pls
+import Position as Ps
+import SearchStats as Ss
+
+AnalysisResult = namedtuple("AnalysisResult", ["position", "player", "score", "best_move", "nodes"])
+
+
+def analyse_chunk(chunk, depth):
+    """
+    Searches a chunk of positions (runs in a worker process, with the caches of ParallelSearch.initialize_worker)
+    :param chunk: list of (position, player) pairs
+    :param depth: depth of the search
+    :return: list with the score, best move and nodes of every position
+    """
+    results = []
+    for position, player in chunk:
+        board = position.to_board(Bb.BitBoard)
+        Pls.worker_table.new_search()
+        Pls.worker_ordering.new_search()
+        stats = Ss.SearchStats()
+        score, best_move = AI.minimax_in_place(board, depth, player, None, table=Pls.worker_table,
+                                               ordering=Pls.worker_ordering, stats=stats)
+        results.append((score, best_move, stats.nodes))
+    return results
+
+
+def analyse(positions, depth, workers=None, chunk_size=16, max_pending=None, table_size=2 ** 16):
+    """
+    Scores positions in parallel. The positions are read as the results are used,
+    so any number of them can be analysed in constant memory
+    :param positions: iterable of (position, player) pairs, the positions are Position or boards of any backend
+    :param depth: depth of the search
+    :param workers: number of processes (all the cores if not given)
+    :param chunk_size: positions sent to a worker at a time
+    :param max_pending: chunks in flight at a time (twice the workers if not given)
+    :param table_size: entries of the transposition table of each worker, kept between positions
+    :return: generator with an AnalysisResult for every position, in the order of the positions
+    """
+    positions = ((position if isinstance(position, Ps.Position) else Ps.Position.from_board(position), player)
+                 for position, player in positions)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(workers, initializer=Pls.initialize_worker, initargs=(table_size,)) as executor:
+        pending = deque()
+        while True:
+            chunk = list(islice(positions, chunk_size))
+            if chunk:
+                pending.append((chunk, executor.submit(analyse_chunk, chunk, depth)))
+            # Wait for the oldest chunk when enough are in flight or there are no more positions
+            if pending and (len(pending) >= max_pending or not chunk):
+                chunk, future = pending.popleft()
+                for (position, player), (score, best_move, nodes) in zip(chunk, future.result()):
+                    yield AnalysisResult(position, player, score, best_move, nodes)
+            elif not chunk:
+                return
+
+
+def archive_positions(archive, games):
+    """
+    Gets every position of the games of a record file with the player to move
+    :param archive: text file with game records
+    :param games: deque where the game number and ply of every position are appended
+    :return: generator with (position, player) pairs
+    """
+    for number, record in enumerate(Gr.read_games(archive)):
+        if not record["moves"]:
+            continue
+        board = Bb.BitBoard()
+        games.append((number, 0))
+        yield Ps.Position.from_board(board), record["first_player"]
+        for ply, (player, move, board) in enumerate(Gr.replay(record), 1):
+            games.append((number, ply))
+            yield Ps.Position.from_board(board), 3 - player
+
+
+def result_record(game, ply, result: AnalysisResult):
+    """
+    Builds the JSON record of an analysed position. Won and lost positions have no score
+    (JSON has no infinity), their result is given for the player to move instead
+    :param game: number of the game in the archive
+    :param ply: moves made in the game before the position
+    :param result: AnalysisResult of the position
+    :return: dictionary with the record
+    """
+    record = {"game": game, "ply": ply, "position": result.position.pack().hex(), "player": result.player,
+              "score": result.score, "result": None,
+              "move": Gr.format_move(result.best_move) if result.best_move else None, "nodes": result.nodes}
+    if math.isinf(result.score):
+        record["score"] = None
+        record["result"] = "win" if (result.score > 0) == (result.player == 1) else "loss"
+    return record
+
+
+def main():
+    """
+    Analyses every position of a game record file from the command line
+    """
+    parser = argparse.ArgumentParser(description="Scores every position of an archive of Hoppers games")
+    parser.add_argument("archive", help="game record file (.jsonl or .jsonl.gz)")
+    parser.add_argument("--depth", type=int, default=2, help="depth of the search of every position")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: all the cores)")
+    parser.add_argument("--chunk-size", type=int, default=16, help="positions sent to a worker at a time")
+    parser.add_argument("--table-size", type=int, default=2 ** 16, help="transposition table entries per worker")
+    parser.add_argument("--output", default="analysis.jsonl", help="JSONL file the results are written to")
+    arguments = parser.parse_args()
+
+    games = deque()
+    analysed = 0
+    start = time.perf_counter()
+    with Gr.open_archive(arguments.archive) as archive, open(arguments.output, "w") as output:
+        for result in analyse(archive_positions(archive, games), arguments.depth, arguments.workers,
+                              arguments.chunk_size, table_size=arguments.table_size):
+            game, ply = games.popleft()
+            output.write(json.dumps(result_record(game, ply, result), allow_nan=False) + "\n")
+            analysed += 1
+
+    elapsed = time.perf_counter() - start
+    print(f"{analysed} posiciones analizadas en {elapsed:.1f} s ({analysed / elapsed:.1f} posiciones/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+    BatchEvaluation.py
+
+    Evaluates all the moves of a position in a single NumPy call (used at the last ply of the searches).
+    NumPy is optional: without it the same values are computed one board at a time.
+    It is only imported when the first batch is evaluated, so importing the engine stays fast
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+import Board as Bd
+
+np = None
+numpy_loaded = False
+# Fixed point distance of every square to the goal of each player
+SQUARE_DISTANCES = None
+# Goal triangle of every square
+SQUARE_ZONES = None
+
+
+def load_numpy():
+    """
+    Imports NumPy and builds the tables the first time they are needed
+    :return: True if NumPy is available
+    """
+    global np, numpy_loaded, SQUARE_DISTANCES, SQUARE_ZONES
+    if not numpy_loaded:
+        numpy_loaded = True
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+        SQUARE_DISTANCES = np.array(Bd.SCALED_GOAL_DISTANCES, dtype=np.int64)
+        SQUARE_ZONES = np.array(Bd.GOAL_ZONES, dtype=np.int8)
+    return np is not None
+
+
+def score(first_sums, second_sums, first_wins, second_wins):
+    """
+    Combines the distance sums and win checks of a batch like Board.evaluate
+    :param first_sums: fixed point distance sums of player one
+    :param second_sums: fixed point distance sums of player two
+    :param first_wins: boolean array, True where player one won
+    :param second_wins: boolean array, True where player two won
+    :return: float array with the valuations
+    """
+    first_score = first_sums / Bd.DISTANCE_SCALE
+    second_score = second_sums / Bd.DISTANCE_SCALE
+    evaluations = (1 / (first_score / 15)) - (1 / (second_score / 15))
+    evaluations[second_wins] = float('-inf')
+    evaluations[first_wins] = float('inf')
+    return evaluations
+
+
+def evaluate_moves(position, moves, player):
+    """
+    Evaluates the board after each move of a position without making the moves,
+    updating the terms that direct_move keeps (distance sums and goal counts) for all of them at once
+    :param position: board position
+    :param moves: list of (initial coordinate, final coordinate) tuples
+    :param player: player who makes the moves
+    :return: list with the valuation of the board after every move
+    """
+    if not moves or not load_numpy():
+        evaluations = []
+        for move in moves:
+            undo = position.apply_move(move[0], move[1], player)
+            evaluations.append(position.evaluate())
+            position.undo_move(undo)
+        return evaluations
+
+    squares = np.array([(initial[0] * 10 + initial[1], final[0] * 10 + final[1]) for initial, final in moves])
+    initial_squares, final_squares = squares[:, 0], squares[:, 1]
+    initial_zones, final_zones = SQUARE_ZONES[initial_squares], SQUARE_ZONES[final_squares]
+
+    sums = [None, np.full(len(moves), position.distance_sums[1]), np.full(len(moves), position.distance_sums[2])]
+    sums[player] += SQUARE_DISTANCES[player][final_squares] - SQUARE_DISTANCES[player][initial_squares]
+
+    wins = [None]
+    for zone in (1, 2):
+        empty = position.goal_empty[zone] + (initial_zones == zone) - (final_zones == zone)
+        pieces = position.goal_pieces[zone]
+        if zone == player:
+            pieces = pieces - (initial_zones == zone) + (final_zones == zone)
+        wins.append((empty == 0) & (pieces > 0))
+    return score(sums[1], sums[2], wins[1], wins[2]).tolist()
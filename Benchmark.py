@@ -0,0 +1,236 @@
+"""
+    Benchmark.py
+
+    Measures the speed of move generation, evaluation and search
+    on a fixed set of positions, and compares it with a saved baseline
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+
+    Usage:
+
+    python Benchmark.py --save baseline.json
+    python Benchmark.py --compare baseline.json --tolerance 0.1
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import AI as AI
+import BitBoard as Bb
+import Board as Bd
+import MoveOrdering as Mo
+import SearchStats as Ss
+import TranspositionTable as Tt
+
+# Positions of the benchmark, player one moves in all of them
+POSITIONS = {
+    "opening": Bd.Board().board,
+    "midgame": [
+        [1, 0, 0, 1, 1, 0, 0, 0, 0, 0],
+        [1, 2, 0, 0, 0, 0, 0, 0, 0, 0],
+        [1, 1, 1, 2, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 1, 0, 0, 0, 0, 0],
+        [1, 0, 0, 2, 1, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 1, 1, 2, 1, 0, 2],
+        [0, 0, 0, 2, 2, 0, 0, 0, 2, 0],
+        [0, 0, 0, 0, 0, 0, 0, 2, 0, 1],
+        [0, 0, 0, 0, 0, 0, 2, 0, 0, 1],
+        [0, 0, 0, 0, 0, 2, 2, 2, 2, 2]
+    ],
+    "crossing": [
+        [0, 0, 0, 1, 1, 0, 0, 0, 0, 0],
+        [2, 2, 0, 1, 0, 0, 0, 0, 0, 0],
+        [0, 2, 1, 2, 1, 0, 0, 0, 0, 0],
+        [0, 0, 2, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 2, 1, 0, 2, 0, 0, 0],
+        [2, 2, 0, 0, 0, 1, 0, 0, 0, 2],
+        [0, 0, 1, 0, 0, 0, 2, 0, 2, 0],
+        [0, 0, 0, 0, 0, 0, 0, 2, 1, 1],
+        [0, 0, 0, 0, 0, 0, 0, 1, 1, 1],
+        [0, 0, 0, 0, 0, 0, 1, 2, 1, 2]
+    ],
+    "endgame": [
+        [2, 2, 2, 2, 0, 0, 0, 0, 0, 0],
+        [2, 2, 2, 0, 0, 0, 0, 0, 0, 0],
+        [2, 2, 2, 2, 0, 0, 0, 0, 0, 0],
+        [2, 2, 2, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0, 0, 0, 0, 0, 0, 0, 0, 1, 1],
+        [0, 0, 0, 0, 0, 0, 1, 1, 1, 1],
+        [0, 0, 0, 0, 0, 1, 1, 1, 1, 1],
+        [0, 0, 0, 0, 0, 1, 1, 1, 1, 2]
+    ]
+}
+
+BACKENDS = {"Board": Bd.Board, "BitBoard": Bb.BitBoard}
+
+
+def build_board(board_class, grid):
+    """
+    Builds a board of a backend with the pieces of a grid
+    :param board_class: Board or BitBoard
+    :param grid: 10x10 list with the pieces
+    :return: the board
+    """
+    return board_class.from_grid(grid)
+
+
+def measure(function, minimum_time):
+    """
+    Calls a function until the minimum time has passed
+    :param function: function to measure (returns the number of operations it made)
+    :param minimum_time: minimum measuring time in seconds
+    :return: operations per second
+    """
+    operations = 0
+    start = time.perf_counter()
+    elapsed = 0
+    while elapsed < minimum_time:
+        operations += function()
+        elapsed = time.perf_counter() - start
+    return operations / elapsed
+
+
+def benchmark_move_generation(board):
+    """
+    Generates the moves of every piece of both players once
+    :param board: board to measure
+    :return: number of get_valid_moves calls
+    """
+    pieces = board.get_pieces(1) + board.get_pieces(2)
+    for piece in pieces:
+        board.get_valid_moves(piece)
+    return len(pieces)
+
+
+def benchmark_evaluation(board):
+    """
+    Evaluates a board several times
+    :param board: board to measure
+    :return: number of evaluate calls
+    """
+    for _ in range(100):
+        board.evaluate()
+    return 100
+
+
+def benchmark_all_moves(board):
+    """
+    Builds the child positions of player one once
+    :param board: board to measure
+    :return: 1 (one get_all_moves call)
+    """
+    for _ in AI.get_all_moves(board, 1, None):
+        pass
+    return 1
+
+
+def benchmark_search(board, depth):
+    """
+    Searches a board with a fresh transposition table and move ordering
+    :param board: board to measure
+    :param depth: depth of the search
+    :return: nodes searched
+    """
+    stats = Ss.SearchStats()
+    AI.minimax_in_place(board, depth, 1, None, table=Tt.TranspositionTable(2 ** 16), ordering=Mo.MoveOrdering(),
+                        stats=stats)
+    return stats.nodes
+
+
+def run_benchmarks(max_depth=4, minimum_time=0.5, backends=None, positions=None):
+    """
+    Runs every benchmark on every position and backend
+    :param max_depth: deepest minimax search measured
+    :param minimum_time: minimum measuring time of every benchmark in seconds
+    :param backends: names of the backends to measure (all if not given)
+    :param positions: names of the positions to measure (all if not given)
+    :return: dictionary with the results: name -> {"value", "unit", "higher_is_better"}
+    """
+    results = {}
+    for backend in backends or BACKENDS:
+        for position in positions or POSITIONS:
+            board = build_board(BACKENDS[backend], POSITIONS[position])
+            prefix = f"{backend}/{position}"
+
+            results[f"{prefix}/get_valid_moves"] = {
+                "value": measure(lambda: benchmark_move_generation(board), minimum_time),
+                "unit": "calls/s", "higher_is_better": True
+            }
+            results[f"{prefix}/evaluate"] = {
+                "value": measure(lambda: benchmark_evaluation(board), minimum_time),
+                "unit": "calls/s", "higher_is_better": True
+            }
+            calls = measure(lambda: benchmark_all_moves(board), minimum_time)
+            results[f"{prefix}/get_all_moves"] = {"value": 1000 / calls, "unit": "ms", "higher_is_better": False}
+
+            for depth in range(1, max_depth + 1):
+                results[f"{prefix}/minimax_depth_{depth}"] = {
+                    "value": measure(lambda: benchmark_search(board, depth), minimum_time),
+                    "unit": "nodes/s", "higher_is_better": True
+                }
+            print(f"{prefix} listo", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a saved baseline
+    :param results: results of run_benchmarks
+    :param baseline: results saved from an earlier run
+    :param tolerance: relative change that is accepted (0.1 = 10 %)
+    :return: list with the names of the benchmarks that got worse
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old_value = baseline[name]["value"]
+        change = (result["value"] - old_value) / old_value
+        if not result["higher_is_better"]:
+            change = -change
+        status = "REGRESION" if change < -tolerance else "ok"
+        if status != "ok":
+            regressions.append(name)
+        print(f"{status:10} {name:45} {old_value:14.2f} -> {result['value']:14.2f} {result['unit']:8} {change:+.1%}")
+    return regressions
+
+
+def main():
+    """
+    Runs the benchmarks from the command line
+    """
+    parser = argparse.ArgumentParser(description="Hoppers engine benchmarks")
+    parser.add_argument("--max-depth", type=int, default=4, help="deepest minimax search measured")
+    parser.add_argument("--min-time", type=float, default=0.5, help="minimum seconds per benchmark")
+    parser.add_argument("--backend", action="append", choices=list(BACKENDS), help="backend to measure")
+    parser.add_argument("--position", action="append", choices=list(POSITIONS), help="position to measure")
+    parser.add_argument("--save", help="JSON file where the results are saved")
+    parser.add_argument("--compare", help="JSON file with baseline results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="accepted relative slowdown")
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(arguments.max_depth, arguments.min_time, arguments.backend, arguments.position)
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+
+    if arguments.save:
+        with open(arguments.save, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        if compare(results, baseline, arguments.tolerance):
+            sys.exit(1)
+    elif not arguments.save:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
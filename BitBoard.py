@@ -0,0 +1,349 @@
+"""
+    BitBoard.py
+
+    Compact board backend for the Hoppers game.
+    Each player's pieces are stored in a 100 bit integer (bit row * 10 + column)
+    and the jumps are read from tables built when the module is imported
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+import Board as Bd
+
+DIMENSION = 10
+SQUARES = DIMENSION * DIMENSION
+
+# clockwise starting with up, same order as Board.adjacent_jumps
+DIRECTIONS = [(-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1)]
+
+SQUARE_COORDINATES = [(index // DIMENSION, index % DIMENSION) for index in range(SQUARES)]
+
+
+def square_index(coordinate):
+    """
+    Gets the bit index of a coordinate
+    :param coordinate: [row, column] coordinate
+    :return: bit index
+    """
+    return coordinate[0] * DIMENSION + coordinate[1]
+
+
+def build_tables():
+    """
+    Builds the neighbour and jump tables of every square
+    :return: neighbour masks and the jumps of each square ("over" bit, landing square and landing bit)
+    """
+    neighbour_masks = []
+    jumps = []
+    for row, column in SQUARE_COORDINATES:
+        neighbours = 0
+        square_jumps = []
+        for row_direction, column_direction in DIRECTIONS:
+            if 0 <= row + row_direction < DIMENSION and 0 <= column + column_direction < DIMENSION:
+                neighbours |= 1 << square_index([row + row_direction, column + column_direction])
+
+            landing_row, landing_column = row + 2 * row_direction, column + 2 * column_direction
+            if 0 <= landing_row < DIMENSION and 0 <= landing_column < DIMENSION:
+                over = square_index([row + row_direction, column + column_direction])
+                landing = square_index([landing_row, landing_column])
+                square_jumps.append((1 << over, landing, 1 << landing))
+
+        neighbour_masks.append(neighbours)
+        jumps.append(square_jumps)
+    return neighbour_masks, jumps
+
+
+def build_zone_mask(player):
+    """
+    Builds the mask of the goal triangle of a player
+    :param player: player one or two
+    :return: mask with the goal squares of the player
+    """
+    mask = 0
+    for row, column in SQUARE_COORDINATES:
+        if player == 1 and row + column >= 14 or player == 2 and row + column <= 4:
+            mask |= 1 << square_index([row, column])
+    return mask
+
+
+NEIGHBOUR_MASKS, JUMPS = build_tables()
+GOAL_MASKS = [0, build_zone_mask(1), build_zone_mask(2)]
+
+
+def mask_indexes(mask):
+    """
+    Gets the indexes of the set bits of a mask in ascending (row major) order
+    :param mask: bit mask
+    :return: list with the indexes
+    """
+    indexes = []
+    while mask:
+        lowest_bit = mask & -mask
+        indexes.append(lowest_bit.bit_length() - 1)
+        mask ^= lowest_bit
+    return indexes
+
+
+def grid_masks(grid):
+    """
+    Gets the piece masks of both players of a grid
+    :param grid: 10x10 list with the pieces
+    :return: (player one mask, player two mask)
+    """
+    masks = [0, 0, 0]
+    for row, items in enumerate(grid):
+        for column, item in enumerate(items):
+            if item != 0:
+                masks[item] |= 1 << square_index([row, column])
+    return masks[1], masks[2]
+
+
+def board_masks(board):
+    """
+    Gets the piece masks of both players of any board backend
+    :param board: Board or BitBoard
+    :return: (player one mask, player two mask)
+    """
+    if isinstance(board, BitBoard):
+        return board.bitboards[1], board.bitboards[2]
+    masks = [0, 0, 0]
+    for player in (1, 2):
+        for piece in board.get_pieces(player):
+            masks[player] |= 1 << square_index(piece)
+    return masks[1], masks[2]
+
+
+class BitBoard(Bd.Board):
+    """
+    Hoppers board stored as one bit mask per player.
+    Keeps the same API as Board so the AI and the game work with either backend
+    """
+    def __init__(self, first_mask=None, second_mask=None):
+        """
+            Initializes the board
+        :param first_mask: optional pieces of player one (the starting position if not given)
+        :param second_mask: optional pieces of player two
+        """
+        if first_mask is not None:
+            self.bitboards = [0, first_mask, second_mask]
+        else:
+            self.bitboards = [0, *grid_masks(Bd.Board().board)]
+
+        self.last_jump_path = []
+        self.last_move = None
+        self.update_tracking()
+
+    @classmethod
+    def from_masks(cls, first_mask, second_mask):
+        """
+        Builds a board from the piece masks of both players
+        :param first_mask: pieces of player one
+        :param second_mask: pieces of player two
+        :return: the board
+        """
+        return cls(first_mask, second_mask)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Builds a board with the pieces of a grid
+        :param grid: 10x10 list with the pieces
+        :return: the board
+        """
+        return cls(*grid_masks(grid))
+
+    @property
+    def board(self):
+        """
+        Builds the list of lists representation of the board. It is a copy:
+        changing its items does not change the board, assign a whole grid instead
+        :return: 10x10 list with the pieces
+        """
+        grid = [[0] * DIMENSION for _ in range(DIMENSION)]
+        for player in (1, 2):
+            for index in mask_indexes(self.bitboards[player]):
+                grid[index // DIMENSION][index % DIMENSION] = player
+        return grid
+
+    @board.setter
+    def board(self, grid):
+        """
+        Replaces the pieces with the ones of a grid
+        :param grid: 10x10 list with the pieces
+        """
+        self.bitboards = [0, *grid_masks(grid)]
+        self.update_tracking()
+
+    def update_tracking(self):
+        """
+        Recomputes the hash and the evaluation terms that direct_move keeps up to date
+        from the piece masks (needed only if the bitboards are replaced)
+        """
+        self.hash_key = self.compute_hash_key()
+        self.distance_sums = [0, 0, 0]
+        self.goal_empty = [0, 0, 0]
+        self.goal_pieces = [0, 0, 0]
+        occupied = self.bitboards[1] | self.bitboards[2]
+        for player in (1, 2):
+            self.distance_sums[player] = sum(Bd.SCALED_GOAL_DISTANCES[player][index]
+                                             for index in mask_indexes(self.bitboards[player]))
+            self.goal_empty[player] = len(mask_indexes(GOAL_MASKS[player] & ~occupied))
+            self.goal_pieces[player] = len(mask_indexes(GOAL_MASKS[player] & self.bitboards[player]))
+
+    def compute_hash_key(self):
+        """
+        Computes the Zobrist hash of the board from scratch
+        (needed only if the bitboards are replaced, direct_move keeps it up to date)
+        :return: hash key
+        """
+        hash_key = 0
+        for player in (1, 2):
+            for index in mask_indexes(self.bitboards[player]):
+                hash_key ^= Bd.ZOBRIST_KEYS[player][index]
+        return hash_key
+
+    def board_item(self, position, offset_row=0, offset_column=0):
+        """
+        Returns a board item with the specified coordinates
+        :param position: coordinate
+        :param offset_row: offset
+        :param offset_column: offset
+        :return: the item
+        """
+        bit = 1 << ((position[0] + offset_row) * DIMENSION + position[1] + offset_column)
+        if self.bitboards[1] & bit:
+            return 1
+        elif self.bitboards[2] & bit:
+            return 2
+        return 0
+
+    def can_jump(self, initial_coordinate, final_coordinate):
+        """
+        Checks if a hopper can move between two coordinates
+        :param initial_coordinate: initial coordinate
+        :param final_coordinate: final coordinate
+        :return: if it can jump and the path it took
+        """
+        self.last_jump_path = [initial_coordinate, final_coordinate]
+        # Did not select a piece
+        if self.board_item(initial_coordinate) == 0:
+            return False, None
+
+        # Adjacent movement
+        elif self.is_adjacent(initial_coordinate, final_coordinate):
+            if self.board_item(final_coordinate) == 0:
+                return True, self.last_jump_path
+            else:
+                return False, None
+
+        # Jump over other pieces
+        else:
+            self.hopper_jump(initial_coordinate, final_coordinate)
+            if len(self.last_jump_path) > 1:
+                return True, self.last_jump_path
+
+        return False, None
+
+    def adjacent_jumps(self, current_coordinate):
+        """
+        Gets all the possible adjacent jumps of a hopper
+        :param current_coordinate: current coordinate
+        :return: list with the adjacent jumps
+        """
+        occupied = self.bitboards[1] | self.bitboards[2]
+        return [list(SQUARE_COORDINATES[landing])
+                for over_bit, landing, landing_bit in JUMPS[square_index(current_coordinate)]
+                if occupied & over_bit and not occupied & landing_bit]
+
+    def explore_moves(self, initial_coordinate):
+        """
+        Finds every square a hopper can reach with a single flood fill over its steps and jumps
+        :param initial_coordinate: initial coordinate
+        :return: dictionary with each reachable coordinate and the coordinate it was reached from
+        """
+        origin = square_index(initial_coordinate)
+        occupied = self.bitboards[1] | self.bitboards[2]
+        predecessors = {SQUARE_COORDINATES[origin]: None}
+
+        for step in mask_indexes(NEIGHBOUR_MASKS[origin] & ~occupied):
+            predecessors[SQUARE_COORDINATES[step]] = SQUARE_COORDINATES[origin]
+
+        blocked = occupied | 1 << origin
+        frontier = [origin]
+        while frontier:
+            current = frontier.pop()
+            for over_bit, landing, landing_bit in JUMPS[current]:
+                if occupied & over_bit and not blocked & landing_bit:
+                    blocked |= landing_bit
+                    predecessors[SQUARE_COORDINATES[landing]] = SQUARE_COORDINATES[current]
+                    frontier.append(landing)
+
+        return predecessors
+
+    def reachable_mask(self, origin):
+        """
+        Gets the mask of every square a hopper can reach in one move
+        :param origin: bit index of the hopper
+        :return: mask with the destinations
+        """
+        occupied = self.bitboards[1] | self.bitboards[2]
+        reached = 1 << origin
+        blocked = occupied | reached
+        frontier = [origin]
+        while frontier:
+            current = frontier.pop()
+            for over_bit, landing, landing_bit in JUMPS[current]:
+                if occupied & over_bit and not blocked & landing_bit:
+                    blocked |= landing_bit
+                    frontier.append(landing)
+
+        return (blocked & ~occupied & ~reached) | (NEIGHBOUR_MASKS[origin] & ~occupied)
+
+    def get_valid_moves(self, initial_coordinate):
+        """
+        Gets all valid moves in a position
+        :param initial_coordinate: initial coordinate
+        :return: list with all valid moves
+        """
+        origin = square_index(initial_coordinate)
+        if not (self.bitboards[1] | self.bitboards[2]) >> origin & 1:
+            return []
+        return [list(SQUARE_COORDINATES[index]) for index in mask_indexes(self.reachable_mask(origin))]
+
+    def direct_move(self, initial_coordinate, final_coordinate, player):
+        """
+        Makes a move without validation (used for the AI)
+        :param initial_coordinate: initial coordinate
+        :param final_coordinate: final coordinate
+        :param player: player who made the move
+        :return: True
+        """
+        initial_index, final_index = square_index(initial_coordinate), square_index(final_coordinate)
+        self.bitboards[player] ^= 1 << initial_index | 1 << final_index
+        self.track_move(initial_index, final_index, player)
+        self.last_move = [initial_coordinate, final_coordinate]
+        return True
+
+    def get_pieces(self, player_turn):
+        """
+        Gets all the pieces of a specified player
+        :param player_turn: current player
+        :return: list with all the piece positions
+        """
+        return [list(SQUARE_COORDINATES[index]) for index in mask_indexes(self.bitboards[player_turn])]
+
+    def spaces_in_zone_two(self):
+        """
+        Gets the number of free spaces in player one's zone (the same squares Board counts)
+        :return: number of free spaces
+        """
+        return len(mask_indexes(GOAL_MASKS[1] & ~(self.bitboards[1] | self.bitboards[2])))
+
+    def spaces_in_zone_one(self):
+        """
+        Gets the number of free spaces in zone one (the same squares Board counts)
+        :return: number of free spaces
+        """
+        return len(mask_indexes(GOAL_MASKS[1] & ~(self.bitboards[1] | self.bitboards[2])))
@@ -9,16 +9,51 @@
     Updated February 9, 2020
 """
 
-from copy import deepcopy
+from collections import namedtuple
+import random
+
+
+def build_zobrist_keys(seed=18259):
+    """
+    Builds the random keys used to hash boards (fixed seed so hashes are stable between runs)
+    :param seed: random seed
+    :return: keys for every player and square, and keys for the player to move
+    """
+    generator = random.Random(seed)
+    square_keys = [[0] * 100] + [[generator.getrandbits(64) for _ in range(100)] for _ in range(2)]
+    turn_keys = [0, generator.getrandbits(64), generator.getrandbits(64)]
+    return square_keys, turn_keys
+
+
+ZOBRIST_KEYS, ZOBRIST_TURN = build_zobrist_keys()
+
+# Distance from every square (row * 10 + column) to the goal corner of each player
+GOAL_DISTANCES = [
+    [0.0] * 100,
+    [((square // 10 - 9) ** 2 + (square % 10 - 9) ** 2) ** 0.5 for square in range(100)],
+    [((square // 10) ** 2 + (square % 10) ** 2) ** 0.5 for square in range(100)]
+]
+
+# Fixed point distances, so the sums kept by direct_move are exact after any number of moves and undos
+DISTANCE_SCALE = 2 ** 32
+SCALED_GOAL_DISTANCES = [[round(distance * DISTANCE_SCALE) for distance in distances] for distances in GOAL_DISTANCES]
+
+# Player whose goal triangle contains each square (0 for squares outside both goals)
+GOAL_ZONES = [1 if square // 10 + square % 10 >= 14 else 2 if square // 10 + square % 10 <= 4 else 0
+              for square in range(100)]
+
+# A move with the coordinates of its path (the origin and destination included)
+MoveRecord = namedtuple("MoveRecord", ["origin", "destination", "path"])
 
 
 class Board:
 
-    def __init__(self):
+    def __init__(self, grid=None):
         """
             Initializes the board
+        :param grid: optional 10x10 list with the pieces (it is copied), the starting position if not given
         """
-        self.board = [
+        self.board = [list(row) for row in grid] if grid is not None else [
             [1, 1, 1, 1, 1, 0, 0, 0, 0, 0],
             [1, 1, 1, 1, 0, 0, 0, 0, 0, 0],
             [1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
@@ -31,9 +66,71 @@ class Board:
             [0, 0, 0, 0, 0, 2, 2, 2, 2, 2]
         ]
 
-        self.explored_coordinates = []
         self.last_jump_path = []
-        self.visited_path = []
+        self.last_move = None
+        self.update_tracking()
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Builds a board with the pieces of a grid
+        :param grid: 10x10 list with the pieces (it is copied)
+        :return: the board
+        """
+        return cls(grid)
+
+    def update_tracking(self):
+        """
+        Recomputes the hash and the evaluation terms that direct_move keeps up to date
+        (needed only if the board is replaced)
+        """
+        grid = self.board
+        self.hash_key = self.compute_hash_key()
+        self.distance_sums = [0, 0, 0]
+        self.goal_empty = [0, 0, 0]
+        self.goal_pieces = [0, 0, 0]
+        for square in range(100):
+            item = grid[square // 10][square % 10]
+            zone = GOAL_ZONES[square]
+            self.distance_sums[item] += SCALED_GOAL_DISTANCES[item][square]
+            if zone != 0 and item == 0:
+                self.goal_empty[zone] += 1
+            elif zone != 0 and item == zone:
+                self.goal_pieces[zone] += 1
+
+    def track_move(self, initial_square, final_square, player):
+        """
+        Updates the hash and the evaluation terms after a piece moves
+        :param initial_square: initial square (row * 10 + column)
+        :param final_square: final square (row * 10 + column)
+        :param player: player who made the move
+        """
+        self.hash_key ^= ZOBRIST_KEYS[player][initial_square] ^ ZOBRIST_KEYS[player][final_square]
+        self.distance_sums[player] += SCALED_GOAL_DISTANCES[player][final_square] - \
+            SCALED_GOAL_DISTANCES[player][initial_square]
+
+        zone = GOAL_ZONES[initial_square]
+        if zone != 0:
+            self.goal_empty[zone] += 1
+            if zone == player:
+                self.goal_pieces[player] -= 1
+        zone = GOAL_ZONES[final_square]
+        if zone != 0:
+            self.goal_empty[zone] -= 1
+            if zone == player:
+                self.goal_pieces[player] += 1
+
+    def compute_hash_key(self):
+        """
+        Computes the Zobrist hash of the board from scratch
+        (needed only if the board list is replaced, direct_move keeps it up to date)
+        :return: hash key
+        """
+        hash_key = 0
+        for row in range(10):
+            for column in range(10):
+                hash_key ^= ZOBRIST_KEYS[self.board[row][column]][row * 10 + column]
+        return hash_key
 
     def is_adjacent(self, initial_coordinate, final_coordinate):
         """
@@ -168,38 +265,73 @@ class Board:
 
         return adjacent_jumps
 
-    def recursive_hopper_path(self, initial_coordinate, final_coordinate, visited, path):
+    def explore_moves(self, initial_coordinate):
         """
-        Gets the path a hopper takes on jumps
+        Finds every square a hopper can reach with a single flood fill over its steps and jumps
         :param initial_coordinate: initial coordinate
-        :param final_coordinate: final coordinate
-        :param visited: visited coordinates
-        :param path: path tanken
+        :return: dictionary with each reachable coordinate and the coordinate it was reached from
         """
-        self.visited_path.append(initial_coordinate)
-        path.append(initial_coordinate)
+        origin = (initial_coordinate[0], initial_coordinate[1])
+        predecessors = {origin: None}
 
-        if initial_coordinate == final_coordinate:
-            self.last_jump_path = deepcopy(path)
+        # Adjacent movement
+        for row in range(max(origin[0] - 1, 0), min(origin[0] + 2, 10)):
+            for column in range(max(origin[1] - 1, 0), min(origin[1] + 2, 10)):
+                if self.board[row][column] == 0:
+                    predecessors[(row, column)] = origin
 
-        else:
-            for coordinate in self.adjacent_jumps(initial_coordinate):
-                if coordinate not in self.visited_path:
-                    self.recursive_hopper_path(coordinate, final_coordinate, self.visited_path, path)
-        path.pop()
-        visited.pop()
+        # Jump chains (landings keep the parity of the origin, so they never collide with a step)
+        frontier = [origin]
+        while frontier:
+            current_coordinate = frontier.pop()
+            for landing in self.adjacent_jumps(current_coordinate):
+                landing = (landing[0], landing[1])
+                if landing not in predecessors:
+                    predecessors[landing] = current_coordinate
+                    frontier.append(landing)
+
+        return predecessors
+
+    def build_path(self, predecessors, final_coordinate):
+        """
+        Rebuilds the path a hopper takes from the predecessors found by explore_moves
+        :param predecessors: dictionary returned by explore_moves
+        :param final_coordinate: final coordinate
+        :return: list with the coordinates of the path, or an empty list if it is unreachable
+        """
+        current_coordinate = (final_coordinate[0], final_coordinate[1])
+        if current_coordinate not in predecessors:
+            return []
+
+        path = []
+        while current_coordinate is not None:
+            path.append([current_coordinate[0], current_coordinate[1]])
+            current_coordinate = predecessors[current_coordinate]
+        path.reverse()
+        return path
 
     def hopper_jump(self, initial_coordinate, final_coordinate):
         """
-        Auxiliary function to call the recursive hopper jump.
-        Resets the jump path and the visited coordinates of the board class
+        Finds the path a hopper takes when jumping between two coordinates.
+        Stores it in the jump path of the board class
         :param initial_coordinate: initial coordinate
         :param final_coordinate: final coordinate
         """
-        self.last_jump_path.clear()
-        visited = self.visited_path = []
-        path = []
-        self.recursive_hopper_path(initial_coordinate, final_coordinate, visited, path)
+        self.last_jump_path = self.build_path(self.explore_moves(initial_coordinate), final_coordinate)
+
+    def get_move_record(self, initial_coordinate, final_coordinate):
+        """
+        Builds the record of a move that is known to be valid, finding its path with a single flood fill
+        :param initial_coordinate: initial coordinate
+        :param final_coordinate: final coordinate
+        :return: MoveRecord of the move
+        """
+        if self.is_adjacent(initial_coordinate, final_coordinate):
+            path = [initial_coordinate, final_coordinate]
+        else:
+            path = self.build_path(self.explore_moves(initial_coordinate), final_coordinate)
+        return MoveRecord((initial_coordinate[0], initial_coordinate[1]), (final_coordinate[0], final_coordinate[1]),
+                          tuple((coordinate[0], coordinate[1]) for coordinate in path))
 
     def make_move(self, initial_coordinate, final_coordinate, player_turn):
         """
@@ -210,11 +342,8 @@ class Board:
         :return: if the move was valid and its path
         """
         can_jump, path = self.can_jump(initial_coordinate, final_coordinate)
-        if can_jump and self.board[initial_coordinate[0]][initial_coordinate[1]] == player_turn:
-            self.board[initial_coordinate[0]][initial_coordinate[1]] = 0
-            self.board[final_coordinate[0]][final_coordinate[1]] = player_turn
-            self.last_move = [initial_coordinate, final_coordinate]
-
+        if can_jump and self.board_item(initial_coordinate) == player_turn:
+            self.direct_move(initial_coordinate, final_coordinate, player_turn)
             return True, path
         else:
             return False, None
@@ -229,41 +358,45 @@ class Board:
         """
         self.board[initial_coordinate[0]][initial_coordinate[1]] = 0
         self.board[final_coordinate[0]][final_coordinate[1]] = player
+        self.track_move(initial_coordinate[0] * 10 + initial_coordinate[1],
+                        final_coordinate[0] * 10 + final_coordinate[1], player)
         self.last_move = [initial_coordinate, final_coordinate]
         return True
 
+    def apply_move(self, initial_coordinate, final_coordinate, player):
+        """
+        Makes a move in place without validation and remembers how to take it back (used for the AI)
+        :param initial_coordinate: initial coordinate
+        :param final_coordinate: final coordinate
+        :param player: player who made the move
+        :return: undo information for undo_move
+        """
+        undo = (initial_coordinate, final_coordinate, player, self.last_move)
+        self.direct_move(initial_coordinate, final_coordinate, player)
+        return undo
+
+    def undo_move(self, undo):
+        """
+        Takes back a move made with apply_move, restoring both squares and the last move
+        :param undo: undo information returned by apply_move
+        """
+        initial_coordinate, final_coordinate, player, last_move = undo
+        self.direct_move(final_coordinate, initial_coordinate, player)
+        self.last_move = last_move
+
     def check_win_player_two(self):
         """
         Checks if player two has won the game
         :return: True if the player two won, else: False
         """
-        element_number = 5
-        win_chance = False
-        for row in range(5):
-            for element in range(element_number):
-                if self.board[row][element] == 0:
-                    return False
-                elif not win_chance and self.board[row][element] == 2:
-                    win_chance = True
-            element_number -= 1
-        return win_chance
+        return self.goal_empty[2] == 0 and self.goal_pieces[2] > 0
 
     def check_win_player_one(self):
         """
         Checks if player one has won
         :return: True if player one won, else: False
         """
-        element_offset = 0
-        win_chance = False
-
-        for row in range(5, 10):
-            for element in range(9 + element_offset, 10):
-                if self.board[row][element] == 0:
-                    return False
-                elif not win_chance and self.board[row][element] == 1:
-                    win_chance = True
-            element_offset -= 1
-        return win_chance
+        return self.goal_empty[1] == 0 and self.goal_pieces[1] > 0
 
     def game_won(self):
         """
@@ -282,24 +415,14 @@ class Board:
         Evaluates the board to see who has an advantage
         :return: valuation
         """
-        if self.game_won() == 1:
+        winner = self.game_won()
+        if winner == 1:
             return float('inf')
-        elif self.game_won() == 2:
+        elif winner == 2:
             return float('-inf')
 
-        first_score = 0
-        second_score = 0
-        for row in range(10):
-            for column in range(10):
-                item = self.board[row][column]
-                if item == 0:
-                    continue
-                elif item == 1:
-                    first_score += ((row - 9) ** 2 + (column - 9) ** 2) ** 0.5
-
-                else:
-                    second_score += (row ** 2 + column ** 2) ** 0.5
-
+        first_score = self.distance_sums[1] / DISTANCE_SCALE
+        second_score = self.distance_sums[2] / DISTANCE_SCALE
         return (1 / (first_score / 15)) - (1 / (second_score / 15))
 
     def spaces_in_zone_two(self):
@@ -363,13 +486,12 @@ class Board:
         :param initial_coordinate: initial coordinate
         :return: list with all valid moves
         """
-        moves = []
-        for row in range(10):
-            for column in range(10):
-                if self.board[row][column] == 0:
-                    if self.can_jump(initial_coordinate, [row, column])[0]:
-                        moves.append([row, column])
-        return moves
+        if self.board[initial_coordinate[0]][initial_coordinate[1]] == 0:
+            return []
+
+        predecessors = self.explore_moves(initial_coordinate)
+        del predecessors[(initial_coordinate[0], initial_coordinate[1])]
+        return [[row, column] for row, column in sorted(predecessors)]
 
     def print_board(self):
         """
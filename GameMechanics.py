@@ -9,17 +9,31 @@
 """
 
 import Board as Bd
+import GameRecord as Gr
 
 
 class Hoppers:
     """
     Hoppers game class
     """
-    def __init__(self):
+    def __init__(self, board_class=Bd.Board, writer: Gr.GameWriter = None):
         """
         Initializes the game
+        :param board_class: board backend (Board.Board or BitBoard.BitBoard)
+        :param writer: optional game record writer, every move made is sent to it
         """
-        self.board = Bd.Board()
+        self.board_class = board_class
+        self.writer = writer
+        self.board = board_class()
+        # Valid moves and flood fill predecessors of the pieces, for the position of cached_hash_key
+        self.cached_moves = {}
+        self.cached_paths = {}
+        self.cached_hash_key = None
+        # (player, MoveRecord) of every move made, and of the moves taken back that can be made again
+        self.history = []
+        self.undone_moves = []
+        # The game was won and written to the game record, its moves can no longer be taken back
+        self.game_written = False
         self.hopper_zones = [
             [1, 1, 1, 1, 1, 0, 0, 0, 0, 0],
             [1, 1, 1, 1, 0, 0, 0, 0, 0, 0],
@@ -65,7 +79,95 @@ class Hoppers:
         :param player_turn: current player
         :return: if the move was valid and the path
         """
-        return self.board.make_move(initial_coordinate, final_coordinate, player_turn)
+        # The flood fill that found the moves of the selected piece also gives the path
+        predecessors = self.get_move_paths(initial_coordinate)
+        final_key = (final_coordinate[0], final_coordinate[1])
+        if self.board.board_item(initial_coordinate) != player_turn or final_key not in predecessors or \
+                predecessors[final_key] is None:
+            return False, None
+
+        path = self.board.build_path(predecessors, final_coordinate)
+        self.board.direct_move(initial_coordinate, final_coordinate, player_turn)
+        self.record_move(player_turn, Bd.MoveRecord((initial_coordinate[0], initial_coordinate[1]), final_key,
+                                                    tuple((coordinate[0], coordinate[1]) for coordinate in path)))
+        return True, path
+
+    def apply_move(self, move, player_turn):
+        """
+        Makes a move that is already known to be valid (found by the AI) without searching its path again
+        :param move: MoveRecord of the move
+        :param player_turn: current player
+        :return: the path of the move
+        """
+        self.board.direct_move(list(move.origin), list(move.destination), player_turn)
+        self.record_move(player_turn, move)
+        return move.path
+
+    def record_move(self, player_turn, move):
+        """
+        Adds a move to the history. Moves taken back can no longer be made again
+        :param player_turn: player who made the move
+        :param move: MoveRecord of the move
+        """
+        self.history.append((player_turn, move))
+        self.undone_moves = []
+        self.write_move(player_turn, move)
+
+    def write_move(self, player_turn, move):
+        """
+        Sends a move to the game record writer, and the game when the move wins it
+        :param player_turn: player who made the move
+        :param move: MoveRecord of the move
+        """
+        if self.writer is None:
+            return
+        self.writer.add_move(player_turn, move)
+        winner = self.board.game_won()
+        if winner is not None:
+            self.writer.finish_game(winner)
+            self.game_written = True
+
+    def undo_move(self):
+        """
+        Takes back the last move (hoppers can always jump back along the same path).
+        A game that is already in the game record can not be taken back
+        :return: (player, MoveRecord) of the move, or None if no move has been made or the game was written
+        """
+        if not self.history or self.game_written:
+            return None
+        player_turn, move = self.history.pop()
+        self.board.direct_move(list(move.destination), list(move.origin), player_turn)
+        self.board.last_move = [list(self.history[-1][1].origin), list(self.history[-1][1].destination)] \
+            if self.history else None
+        self.undone_moves.append((player_turn, move))
+        if self.writer is not None:
+            self.writer.remove_move()
+        return player_turn, move
+
+    def redo_move(self):
+        """
+        Makes again the last move taken back
+        :return: (player, MoveRecord) of the move, or None if there is no move to make again or the game was written
+        """
+        if not self.undone_moves or self.game_written:
+            return None
+        player_turn, move = self.undone_moves.pop()
+        self.board.direct_move(list(move.origin), list(move.destination), player_turn)
+        self.history.append((player_turn, move))
+        self.write_move(player_turn, move)
+        return player_turn, move
+
+    def replay(self, history):
+        """
+        Restarts the game and makes the moves of a history. The game in play is not written
+        to the game record, the writer gets the moves of the history as the current game
+        :param history: list of (player, MoveRecord)
+        """
+        if self.writer is not None:
+            self.writer.discard_game()
+        self.reset()
+        for player_turn, move in history:
+            self.apply_move(move, player_turn)
 
     def check_win(self):
         """
@@ -82,7 +184,48 @@ class Hoppers:
         return self.board
 
     def restart(self):
-        self.__init__()
+        """
+        Starts a new game. An unfinished game is written to the game record as unfinished
+        """
+        if self.writer is not None and self.writer.moves:
+            self.writer.finish_game(None)
+        self.reset()
+
+    def reset(self):
+        """
+        Resets the board and the history without writing anything to the game record
+        """
+        self.__init__(self.board_class, self.writer)
+
+    def get_move_paths(self, piece):
+        """
+        Gets the squares a piece can reach, each one with the square it is reached from.
+        They are cached until the board changes, so checking a move of the selected piece
+        does not search its moves again
+        :param piece: piece coordinate
+        :return: dictionary returned by explore_moves (only the piece itself if the square is empty)
+        """
+        if self.board.hash_key != self.cached_hash_key:
+            self.cached_moves = {}
+            self.cached_paths = {}
+            self.cached_hash_key = self.board.hash_key
+
+        piece_key = (piece[0], piece[1])
+        if piece_key not in self.cached_paths:
+            self.cached_paths[piece_key] = self.board.explore_moves(piece) if self.board.board_item(piece) != 0 \
+                else {piece_key: None}
+        return self.cached_paths[piece_key]
 
     def get_possible_moves(self, piece):
-        return self.board.get_valid_moves(piece)
+        """
+        Gets the valid moves of a piece. They are cached until the board changes,
+        so redrawing a selected piece does not search its moves again
+        :param piece: piece coordinate
+        :return: list with all valid moves
+        """
+        predecessors = self.get_move_paths(piece)
+        piece_key = (piece[0], piece[1])
+        if piece_key not in self.cached_moves:
+            self.cached_moves[piece_key] = [[row, column] for row, column in sorted(predecessors)
+                                            if predecessors[(row, column)] is not None]
+        return self.cached_moves[piece_key]
@@ -0,0 +1,189 @@
+"""
+    GameRecord.py
+
+    Game records: one JSON line per game with its metadata and its moves
+    as "rc-rc" origin and destination pairs (for example "31-42").
+    Games are written as they finish and read back one line at a time,
+    so archives of any size are read in constant memory
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+
+    Usage:
+
+    python GameRecord.py games.jsonl
+    python GameRecord.py games.jsonl.gz --check
+"""
+
+import argparse
+import gzip
+import json
+import BitBoard as Bb
+
+
+def format_move(move):
+    """
+    Writes a move in the notation of the records
+    :param move: (origin, destination) pair or MoveRecord
+    :return: text like "31-42"
+    """
+    return f"{move[0][0]}{move[0][1]}-{move[1][0]}{move[1][1]}"
+
+
+def parse_move(text):
+    """
+    Reads a move written by format_move
+    :param text: text like "31-42"
+    :return: (origin, destination) tuple
+    """
+    return (int(text[0]), int(text[1])), (int(text[3]), int(text[4]))
+
+
+class GameWriter:
+    """
+    Writes the games of a Hoppers game to a record file. It gets every move from the game,
+    and writes the game as one line when it is finished
+    """
+    def __init__(self, file, metadata=None):
+        """
+        Initializes the writer
+        :param file: text file opened for writing or appending
+        :param metadata: dictionary added to every game (players, settings...)
+        """
+        self.file = file
+        self.metadata = metadata if metadata is not None else {}
+        self.first_player = None
+        self.moves = []
+
+    def add_move(self, player, move):
+        """
+        Adds a move to the current game
+        :param player: player who made the move
+        :param move: (origin, destination) pair or MoveRecord
+        """
+        if not self.moves:
+            self.first_player = player
+        self.moves.append(format_move(move))
+
+    def remove_move(self):
+        """
+        Removes the last move of the current game (it was taken back)
+        """
+        if self.moves:
+            self.moves.pop()
+
+    def discard_game(self):
+        """
+        Drops the moves of the current game without writing it
+        """
+        self.first_player = None
+        self.moves = []
+
+    def finish_game(self, winner, **metadata):
+        """
+        Writes the current game and starts a new one
+        :param winner: 1, 2, or None if the game was not finished
+        :param metadata: values added to this game only
+        """
+        record = dict(self.metadata, **metadata)
+        record.update({"winner": winner, "first_player": self.first_player, "moves": " ".join(self.moves)})
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        self.first_player = None
+        self.moves = []
+
+
+def open_archive(path, mode="r"):
+    """
+    Opens a record file, compressed with gzip if its name ends with .gz
+    :param path: path of the file
+    :param mode: "r", "w" or "a"
+    :return: text file
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t")
+    return open(path, mode)
+
+
+def read_games(file):
+    """
+    Reads the games of a record file one at a time
+    :param file: text file
+    :return: generator with the record of every game, its moves as a list of (origin, destination) tuples
+    """
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        record["moves"] = [parse_move(move) for move in record["moves"].split()]
+        yield record
+
+
+def replay(record, board_class=Bb.BitBoard):
+    """
+    Replays the moves of a game on a board without validating them
+    :param record: game returned by read_games
+    :param board_class: board backend
+    :return: generator with (player, move, board) after every move (the same board is updated every time)
+    """
+    board = board_class()
+    player = record["first_player"]
+    for move in record["moves"]:
+        board.direct_move(list(move[0]), list(move[1]), player)
+        yield player, move, board
+        player = 3 - player
+
+
+def check_game(record, board_class=Bb.BitBoard):
+    """
+    Checks that every move of a game is valid and that the game ends with its winner
+    :param record: game returned by read_games
+    :param board_class: board backend
+    :return: None if the game is correct, else a text describing the first problem
+    """
+    board = board_class()
+    player = record["first_player"]
+    for number, move in enumerate(record["moves"]):
+        if board.game_won() is not None:
+            return f"movimiento {number + 1} despues del final de la partida"
+        if not board.make_move(list(move[0]), list(move[1]), player)[0]:
+            return f"movimiento {number + 1} invalido: {format_move(move)}"
+        player = 3 - player
+    if board.game_won() != record["winner"]:
+        return f"ganador {record['winner']} pero el tablero da {board.game_won()}"
+    return None
+
+
+def main():
+    """
+    Summarizes (and optionally checks) a record file from the command line
+    """
+    parser = argparse.ArgumentParser(description="Reads an archive of Hoppers games")
+    parser.add_argument("archive", help="record file (.jsonl or .jsonl.gz)")
+    parser.add_argument("--check", action="store_true", help="check that every move of every game is valid")
+    arguments = parser.parse_args()
+
+    games = 0
+    moves = 0
+    wins = [0, 0, 0]
+    errors = 0
+    with open_archive(arguments.archive) as archive:
+        for record in read_games(archive):
+            games += 1
+            moves += len(record["moves"])
+            wins[record["winner"] or 0] += 1
+            if arguments.check:
+                error = check_game(record)
+                if error is not None:
+                    errors += 1
+                    print(f"Partida {games}: {error}")
+
+    print(f"{games} partidas, {moves / games if games else 0:.1f} movimientos por partida")
+    print(f"Jugador 1: {wins[1]}  Jugador 2: {wins[2]}  Sin terminar: {wins[0]}")
+    if errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+    MoveOrdering.py
+
+    Orders the moves searched by the AI so alpha beta
+    pruning cuts as early as possible
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+import Board as Bd
+
+
+def static_score(move, player):
+    """
+    Cheap score of a move: distance gained toward the goal corner, then length of the move
+    (long jump chains gain the most ground)
+    :param move: (initial coordinate, final coordinate) tuple
+    :param player: player who makes the move
+    :return: score, higher is searched first
+    """
+    initial_coordinate, final_coordinate = move
+    distances = Bd.GOAL_DISTANCES[player]
+    gain = distances[initial_coordinate[0] * 10 + initial_coordinate[1]] - \
+        distances[final_coordinate[0] * 10 + final_coordinate[1]]
+    length = max(abs(initial_coordinate[0] - final_coordinate[0]), abs(initial_coordinate[1] - final_coordinate[1]))
+    return gain, length
+
+
+class MoveOrdering:
+    """
+    Killer moves and history counters collected during a search
+    """
+    def __init__(self, killer_slots=2):
+        """
+        Initializes the ordering
+        :param killer_slots: number of killer moves remembered per ply
+        """
+        self.killer_slots = killer_slots
+        self.killers = []
+        self.history = [{}, {}, {}]
+
+    def order(self, moves, player, ply):
+        """
+        Sorts moves in place: killer moves of the ply first, then by static score and history counter
+        :param moves: list of (initial coordinate, final coordinate) tuples
+        :param player: player who is going to move
+        :param ply: distance from the root of the search
+        :return: the sorted moves
+        """
+        killers = self.killers[ply] if ply < len(self.killers) else []
+        history = self.history[player]
+        moves.sort(key=lambda move: (move in killers, static_score(move, player), history.get(move, 0)),
+                   reverse=True)
+        return moves
+
+    def record_cutoff(self, move, player, ply, depth):
+        """
+        Remembers a move that caused a beta cutoff
+        :param move: move that caused the cutoff
+        :param player: player who made the move
+        :param ply: distance from the root of the search
+        :param depth: remaining depth of the node
+        """
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.killer_slots:]
+
+        self.history[player][move] = self.history[player].get(move, 0) + depth * depth
+
+    def new_search(self):
+        """
+        Forgets the killer moves (they belong to the plies of the previous search) and ages the history
+        """
+        self.killers = []
+        for history in self.history:
+            for move in history:
+                history[move] //= 2
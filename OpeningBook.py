@@ -0,0 +1,182 @@
+"""
+    OpeningBook.py
+
+    Opening book of the AI: the best moves of the first plies of the game,
+    found offline with deep searches and stored by position hash
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+
+    Usage:
+
+    python OpeningBook.py --player 2 --plies 4 --depth 4 --output opening_book.bin
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import struct
+import AI as AI
+import BitBoard as Bb
+import Board as Bd
+import MoveOrdering as Mo
+import Position as Ps
+import TranspositionTable as Tt
+
+MAGIC = b"HOPB"
+VERSION = 1
+# Zobrist key of the position and player to move, initial square, final square, score
+RECORD = struct.Struct("<QBBf")
+
+
+def position_key(board, player):
+    """
+    Gets the key of a position in the book
+    :param board: board position
+    :param player: player who is going to move
+    :return: key
+    """
+    return board.hash_key ^ Bd.ZOBRIST_TURN[player]
+
+
+class OpeningBook:
+    """
+    Best moves of the opening positions
+    """
+    def __init__(self, entries=None):
+        """
+        Initializes the book
+        :param entries: dictionary key -> (move, score)
+        """
+        self.entries = entries if entries is not None else {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, board, player, move, score):
+        """
+        Adds the best move of a position
+        :param board: board position
+        :param player: player who is going to move
+        :param move: (initial coordinate, final coordinate) tuple
+        :param score: score of the position
+        """
+        self.entries[position_key(board, player)] = (move, score)
+
+    def lookup(self, board, player):
+        """
+        Looks up the best move of a position. The move is checked to be valid on the board
+        :param board: board position
+        :param player: player who is going to move
+        :return: (move, score) or None if the position is not in the book
+        """
+        entry = self.entries.get(position_key(board, player))
+        if entry is None:
+            return None
+        move, score = entry
+        if board.board_item(move[0]) != player or list(move[1]) not in board.get_valid_moves(move[0]):
+            return None
+        return move, score
+
+    def save(self, path):
+        """
+        Writes the book to a binary file (records sorted by key)
+        :param path: path of the file
+        """
+        with open(path, "wb") as book_file:
+            book_file.write(MAGIC + struct.pack("<BI", VERSION, len(self.entries)))
+            for key in sorted(self.entries):
+                move, score = self.entries[key]
+                book_file.write(RECORD.pack(key, Bb.square_index(move[0]), Bb.square_index(move[1]), score))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a book written by save
+        :param path: path of the file
+        :return: the book
+        """
+        with open(path, "rb") as book_file:
+            data = book_file.read()
+        if data[:4] != MAGIC or data[4] != VERSION:
+            raise ValueError(f"{path} is not an opening book (version {VERSION})")
+
+        count = struct.unpack_from("<I", data, 5)[0]
+        entries = {}
+        for key, initial_square, final_square, score in RECORD.iter_unpack(data[9:9 + count * RECORD.size]):
+            entries[key] = (Bb.SQUARE_COORDINATES[initial_square], Bb.SQUARE_COORDINATES[final_square]), score
+        return cls(entries)
+
+
+def search_position(position, player, depth):
+    """
+    Searches a book position deeply (runs in a worker process)
+    :param position: compact position
+    :param player: player who is going to move
+    :param depth: depth of the search
+    :return: evaluation and best move
+    """
+    board = position.to_board(Bb.BitBoard)
+    return AI.minimax_in_place(board, depth, player, None, table=Tt.TranspositionTable(2 ** 18),
+                               ordering=Mo.MoveOrdering())
+
+
+def build_book(player, plies, depth, breadth=None, workers=None):
+    """
+    Builds the book of a player: every position of the player in the first plies is searched.
+    All the replies of the opponent are followed (or the best ordered ones if breadth is given),
+    and only the book move of the player
+    :param player: player the book is for
+    :param plies: number of plies from the start of the game
+    :param depth: depth of the search of every position
+    :param breadth: maximum number of opponent replies followed
+    :param workers: number of processes (all the cores if not given)
+    :return: the book
+    """
+    book = OpeningBook()
+    level = [(Ps.Position.from_board(Bb.BitBoard()), 1)]
+    with ProcessPoolExecutor(workers) as executor:
+        for ply in range(plies):
+            searched = [position for position, to_move in level if to_move == player]
+            results = dict(zip(searched, executor.map(search_position, searched, [player] * len(searched),
+                                                      [depth] * len(searched))))
+
+            next_level = {}
+            for position, to_move in level:
+                board = position.to_board(Bb.BitBoard)
+                if board.game_won() is not None:
+                    continue
+                if to_move == player:
+                    score, move = results[position]
+                    book.add(board, player, move, score)
+                    moves = [move]
+                else:
+                    moves = Mo.MoveOrdering().order(AI.get_move_list(board, to_move), to_move, 0)[:breadth]
+
+                for move in moves:
+                    next_level[position.apply(move[0], move[1], to_move)] = 3 - to_move
+            level = list(next_level.items())
+            print(f"Ply {ply + 1}: {len(book)} posiciones en el libro")
+    return book
+
+
+def main():
+    """
+    Builds an opening book from the command line
+    """
+    parser = argparse.ArgumentParser(description="Builds the opening book of the AI")
+    parser.add_argument("--player", type=int, default=2, choices=[1, 2], help="player the book is for")
+    parser.add_argument("--plies", type=int, default=2, help="plies from the start of the game")
+    parser.add_argument("--depth", type=int, default=4, help="depth of the search of every position")
+    parser.add_argument("--breadth", type=int, default=None, help="opponent replies followed (default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: all the cores)")
+    parser.add_argument("--output", default="opening_book.bin", help="file the book is written to")
+    arguments = parser.parse_args()
+
+    book = build_book(arguments.player, arguments.plies, arguments.depth, arguments.breadth, arguments.workers)
+    book.save(arguments.output)
+    print(f"{len(book)} posiciones guardadas en {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
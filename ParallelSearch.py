@@ -0,0 +1,168 @@
+"""
+    ParallelSearch.py
+
+    Root parallel minimax: the moves of the root are searched
+    by a pool of processes, each one with its own transposition table.
+    The best score of the root is shared with the workers, which read it
+    before every reply they search, so running searches also get the new bounds
+
+    Used by SelfPlay.py --search-workers
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import multiprocessing
+import os
+import AI as AI
+import BitBoard as Bb
+import MoveOrdering as Mo
+import Position as Ps
+import SearchStats as Ss
+import TranspositionTable as Tt
+
+# Caches of each worker process, kept warm between searches
+worker_table = None
+worker_ordering = None
+# Best score of the root found so far, shared by the pool and its workers
+root_bound = None
+
+
+def initialize_worker(table_size, bound=None):
+    """
+    Creates the caches of a worker process
+    :param table_size: entries of the transposition table of the worker
+    :param bound: optional shared value with the best score of the root
+    """
+    global worker_table, worker_ordering, root_bound
+    worker_table = Tt.TranspositionTable(table_size)
+    worker_ordering = Mo.MoveOrdering()
+    root_bound = bound
+
+
+def search_root_move(root, move, player, depth, alpha, beta):
+    """
+    Searches one root move (runs in a worker process). The replies of the opponent are searched here,
+    each one with the best score the root has when it starts
+    :param root: compact root position
+    :param move: root move to search
+    :param player: player who makes the root move
+    :param depth: depth of the root search
+    :param alpha: alpha value known when the move was sent
+    :param beta: beta value known when the move was sent
+    :return: the move, its evaluation and the nodes searched
+    """
+    board = root.apply(move[0], move[1], player).to_board(Bb.BitBoard)
+    worker_table.new_search()
+    stats = Ss.SearchStats()
+    opponent = 3 - player
+    if depth == 1 or board.game_won() is not None:
+        evaluation = AI.minimax_in_place(board, depth - 1, opponent, None, alpha, beta, table=worker_table,
+                                         ordering=worker_ordering, stats=stats, ply=1)[0]
+        return move, evaluation, stats.nodes
+
+    stats.count_node(1)
+    replies = worker_ordering.order(AI.get_move_list(board, opponent), opponent, 1)
+    evaluation = float('inf') if opponent == 2 else float('-inf')
+    for reply in replies:
+        # A better root move may have finished since the move was sent
+        if root_bound is not None:
+            if player == 1:
+                alpha = max(alpha, root_bound.value)
+            else:
+                beta = min(beta, root_bound.value)
+        undo = AI.apply_move(board, reply, opponent)
+        try:
+            value = AI.minimax_in_place(board, depth - 2, player, None, alpha, beta, table=worker_table,
+                                        ordering=worker_ordering, stats=stats, ply=2)[0]
+        finally:
+            AI.undo_move(board, undo)
+        if opponent == 2:
+            evaluation = min(evaluation, value)
+            beta = min(beta, evaluation)
+        else:
+            evaluation = max(evaluation, value)
+            alpha = max(alpha, evaluation)
+        if alpha >= beta:
+            worker_ordering.record_cutoff(reply, opponent, 1, depth - 1)
+            break
+    return move, evaluation, stats.nodes
+
+
+class ParallelSearch:
+    """
+    Pool of processes that search the root moves of a position in parallel
+    """
+    def __init__(self, workers=None, table_size=2 ** 16):
+        """
+        Initializes the pool
+        :param workers: number of processes (all the cores if not given)
+        :param table_size: entries of the transposition table of each worker
+        """
+        self.workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context()
+        self.bound = context.Value("d", 0.0)
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=initialize_worker,
+                                            initargs=(table_size, self.bound))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Stops the worker processes
+        """
+        self.executor.shutdown(cancel_futures=True)
+
+    def search(self, position, depth, max_player, stats: Ss.SearchStats = None):
+        """
+        Searches a position. The best ordered move is searched first to get a bound,
+        then the other moves are sent as workers become free. The best bound found so far is sent
+        with every move and shared with the moves that are already being searched
+        :param position: current board position (any backend, it is sent as a compact position)
+        :param depth: maximum analysis depth
+        :param max_player: player who is being analyzed
+        :param stats: optional statistics, the nodes of every worker are added
+        :return: evaluation and best move as an (initial coordinate, final coordinate) tuple
+        """
+        if depth == 0 or position.game_won() is not None:
+            return position.evaluate(), None
+
+        root = Ps.Position.from_board(position)
+        moves = Mo.MoveOrdering().order(AI.get_move_list(position, max_player), max_player, 0)
+        best_evaluation = float('-inf') if max_player == 1 else float('inf')
+        best_move = None
+        self.bound.value = best_evaluation
+
+        pending = set()
+        next_move = 0
+        while next_move < len(moves) or pending:
+            # Wait for the first move alone, it gives the bound the other moves are searched with
+            while next_move < len(moves) and len(pending) < self.workers and (next_move == 0 or best_move is not None):
+                alpha = best_evaluation if max_player == 1 else float('-inf')
+                beta = best_evaluation if max_player == 2 else float('inf')
+                pending.add(self.executor.submit(search_root_move, root, moves[next_move], max_player, depth,
+                                                 alpha, beta))
+                next_move += 1
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                move, evaluation, nodes = future.result()
+                if stats is not None:
+                    stats.nodes += nodes
+                if best_move is None or max_player == 1 and evaluation > best_evaluation or \
+                        max_player == 2 and evaluation < best_evaluation:
+                    best_evaluation, best_move = evaluation, move
+                    self.bound.value = best_evaluation
+
+            if best_evaluation == (float('inf') if max_player == 1 else float('-inf')):
+                for future in pending:
+                    future.cancel()
+                break
+
+        return best_evaluation, best_move
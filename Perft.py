@@ -0,0 +1,180 @@
+"""
+    Perft.py
+
+    Counts the positions reachable in N moves to verify
+    and measure the move generators of the different boards
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+
+    Usage:
+
+    python Perft.py --depth 3
+    python Perft.py --depth 3 --divide --generator bitboard
+    python Perft.py --depth 3 --compare reference bitboard
+"""
+
+import argparse
+import time
+import AI as AI
+import Benchmark as Bench
+import BitBoard as Bb
+import Board as Bd
+import Position as Ps
+
+
+class ReferenceBoard(Bd.Board):
+    """
+    Board that finds the moves of a piece like the original move generator:
+    a separate depth first jump search for every empty square of the board
+    """
+    def get_valid_moves(self, initial_coordinate):
+        """
+        Gets all valid moves in a position
+        :param initial_coordinate: initial coordinate
+        :return: list with all valid moves
+        """
+        if self.board_item(initial_coordinate) == 0:
+            return []
+
+        moves = []
+        for row in range(10):
+            for column in range(10):
+                if self.board[row][column] != 0:
+                    continue
+                if self.is_adjacent(initial_coordinate, [row, column]) or \
+                        self.reference_jump(initial_coordinate, [row, column], []):
+                    moves.append([row, column])
+        return moves
+
+    def reference_jump(self, current_coordinate, final_coordinate, visited):
+        """
+        Searches a chain of jumps between two coordinates
+        :param current_coordinate: current coordinate
+        :param final_coordinate: final coordinate
+        :param visited: coordinates already visited
+        :return: True if the hopper can jump to the final coordinate
+        """
+        visited.append(current_coordinate)
+        if current_coordinate == final_coordinate:
+            return True
+        for coordinate in self.adjacent_jumps(current_coordinate):
+            if coordinate not in visited and self.reference_jump(coordinate, final_coordinate, visited):
+                return True
+        return False
+
+
+GENERATORS = {"board": Bd.Board, "bitboard": Bb.BitBoard, "reference": ReferenceBoard}
+
+
+def perft(position, depth, player):
+    """
+    Counts the leaf positions of the move tree (won positions are leaves)
+    :param position: current board position
+    :param depth: depth of the tree
+    :param player: player who is going to move
+    :return: number of leaf positions
+    """
+    if depth == 0 or position.game_won() is not None:
+        return 1
+    elif depth == 1:
+        return sum(len(position.get_valid_moves(piece)) for piece in position.get_pieces(player))
+
+    return sum(perft(child.to_board(type(position)), depth - 1, 3 - player)
+               for child in AI.get_all_moves(position, player, None))
+
+
+def divide(position, depth, player):
+    """
+    Counts the leaf positions below every move of the root
+    :param position: current board position
+    :param depth: depth of the tree
+    :param player: player who is going to move
+    :return: dictionary with the count of every root move
+    """
+    root = Ps.Position.from_board(position)
+    return {move: perft(root.apply(move[0], move[1], player).to_board(type(position)), depth - 1, 3 - player)
+            for move in AI.get_move_list(position, player)}
+
+
+def find_disagreement(first, second, depth, player, line=()):
+    """
+    Walks the move tree with two boards at the same time looking for a position where their moves differ
+    :param first: board of the first generator
+    :param second: board of the second generator (same position)
+    :param depth: depth of the tree
+    :param player: player who is going to move
+    :param line: moves that lead to the position
+    :return: dictionary describing the first disagreement, or None if the generators agree
+    """
+    first_pieces, second_pieces = first.get_pieces(player), second.get_pieces(player)
+    if first_pieces != second_pieces:
+        return {"line": line, "player": player, "board": first.board, "first_pieces": first_pieces,
+                "second_pieces": second_pieces}
+
+    for piece in first_pieces:
+        first_moves, second_moves = first.get_valid_moves(piece), second.get_valid_moves(piece)
+        if first_moves != second_moves:
+            return {"line": line, "player": player, "board": first.board, "piece": piece,
+                    "only_first": [move for move in first_moves if move not in second_moves],
+                    "only_second": [move for move in second_moves if move not in first_moves]}
+
+    if depth <= 1 or first.game_won() is not None:
+        return None
+
+    for move in AI.get_move_list(first, player):
+        first_undo = first.apply_move(move[0], move[1], player)
+        second_undo = second.apply_move(move[0], move[1], player)
+        disagreement = find_disagreement(first, second, depth - 1, 3 - player, line + (move,))
+        first.undo_move(first_undo)
+        second.undo_move(second_undo)
+        if disagreement is not None:
+            return disagreement
+    return None
+
+
+def main():
+    """
+    Runs perft from the command line
+    """
+    parser = argparse.ArgumentParser(description="Hoppers move generator verification")
+    parser.add_argument("--depth", type=int, default=3, help="depth of the move tree")
+    parser.add_argument("--position", default="opening", choices=list(Bench.POSITIONS), help="starting position")
+    parser.add_argument("--player", type=int, default=1, choices=[1, 2], help="player who moves first")
+    parser.add_argument("--generator", default="bitboard", choices=list(GENERATORS), help="move generator")
+    parser.add_argument("--divide", action="store_true", help="show the count of every root move")
+    parser.add_argument("--compare", nargs=2, choices=list(GENERATORS), metavar=("FIRST", "SECOND"),
+                        help="walk the tree with two generators and show the first position where they differ")
+    arguments = parser.parse_args()
+    grid = Bench.POSITIONS[arguments.position]
+
+    if arguments.compare:
+        first = Bench.build_board(GENERATORS[arguments.compare[0]], grid)
+        second = Bench.build_board(GENERATORS[arguments.compare[1]], grid)
+        disagreement = find_disagreement(first, second, arguments.depth, arguments.player)
+        if disagreement is None:
+            print(f"{arguments.compare[0]} y {arguments.compare[1]} coinciden hasta profundidad {arguments.depth}")
+            return
+        print("Primera diferencia despues de", list(disagreement.pop("line")))
+        for row in disagreement.pop("board"):
+            print(row)
+        for key, value in disagreement.items():
+            print(key, value)
+        raise SystemExit(1)
+
+    board = Bench.build_board(GENERATORS[arguments.generator], grid)
+    start = time.perf_counter()
+    if arguments.divide:
+        counts = divide(board, arguments.depth, arguments.player)
+        for move, count in counts.items():
+            print(move, count)
+        nodes = sum(counts.values())
+    else:
+        nodes = perft(board, arguments.depth, arguments.player)
+    elapsed = time.perf_counter() - start
+    print(f"perft({arguments.depth}) = {nodes}  {elapsed:.3f} s  {nodes / elapsed:.0f} posiciones/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+    Position.py
+
+    Compact immutable position of the Hoppers game: the piece masks of both players.
+    It can be used as a dictionary key, pickles to a few bytes and is cheap to keep in
+    caches or to send to other processes
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+from collections import namedtuple
+import BitBoard as Bb
+
+PACKED_SIZE = 25
+
+
+class Position(namedtuple("Position", ["first", "second"])):
+    """
+    Pieces of player one and player two as 100 bit masks (bit row * 10 + column)
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Gets the position of a board
+        :param board: board of any backend
+        :return: the position
+        """
+        return cls(*Bb.board_masks(board))
+
+    @classmethod
+    def unpack(cls, data):
+        """
+        Reads a position written by pack
+        :param data: 25 bytes
+        :return: the position
+        """
+        value = int.from_bytes(data, "little")
+        return cls(value & (1 << Bb.SQUARES) - 1, value >> Bb.SQUARES)
+
+    def pack(self):
+        """
+        Packs the position in 25 bytes (player one in the low 100 bits)
+        :return: bytes
+        """
+        return (self.first | self.second << Bb.SQUARES).to_bytes(PACKED_SIZE, "little")
+
+    def to_board(self, board_class=Bb.BitBoard):
+        """
+        Builds a board with the position
+        :param board_class: board backend
+        :return: the board
+        """
+        if issubclass(board_class, Bb.BitBoard):
+            return board_class.from_masks(self.first, self.second)
+        return board_class.from_grid(self.grid())
+
+    def grid(self):
+        """
+        Builds the list of lists representation of the position
+        :return: 10x10 list with the pieces
+        """
+        grid = [[0] * Bb.DIMENSION for _ in range(Bb.DIMENSION)]
+        for player, mask in ((1, self.first), (2, self.second)):
+            for index in Bb.mask_indexes(mask):
+                grid[index // Bb.DIMENSION][index % Bb.DIMENSION] = player
+        return grid
+
+    def apply(self, initial_coordinate, final_coordinate, player):
+        """
+        Gets the position after a move, without validation
+        :param initial_coordinate: initial coordinate
+        :param final_coordinate: final coordinate
+        :param player: player who made the move
+        :return: new position
+        """
+        move_mask = 1 << Bb.square_index(initial_coordinate) | 1 << Bb.square_index(final_coordinate)
+        if player == 1:
+            return Position(self.first ^ move_mask, self.second)
+        return Position(self.first, self.second ^ move_mask)
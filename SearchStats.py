@@ -0,0 +1,103 @@
+"""
+    SearchStats.py
+
+    Counters and timers collected while the AI searches.
+    The search only touches them when a SearchStats object is passed,
+    so a search without statistics does not pay for them
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+import sys
+import time
+
+
+class SearchStats:
+    """
+    Statistics of a search
+    """
+    def __init__(self):
+        """
+        Initializes the counters
+        """
+        self.nodes = 0
+        self.nodes_per_ply = []
+        self.interior_nodes = 0
+        self.moves_generated = 0
+        self.cutoffs = 0
+        self.cutoff_indexes = {}
+        self.table_probes = 0
+        self.table_hits = 0
+        self.move_generation_time = 0.0
+        self.evaluation_time = 0.0
+        self.copy_time = 0.0
+        self.make_move_time = 0.0
+        self.start_time = time.perf_counter()
+
+    def count_node(self, ply):
+        """
+        Counts a visited node
+        :param ply: distance from the root of the search
+        """
+        self.nodes += 1
+        while len(self.nodes_per_ply) <= ply:
+            self.nodes_per_ply.append(0)
+        self.nodes_per_ply[ply] += 1
+
+    def count_moves(self, moves):
+        """
+        Counts the moves generated in an interior node
+        :param moves: number of moves
+        """
+        self.interior_nodes += 1
+        self.moves_generated += moves
+
+    def count_cutoff(self, move_index):
+        """
+        Counts a beta cutoff
+        :param move_index: position of the move that caused it in the ordered move list (0 is the first move)
+        """
+        self.cutoffs += 1
+        self.cutoff_indexes[move_index] = self.cutoff_indexes.get(move_index, 0) + 1
+
+    def count_probe(self, hit):
+        """
+        Counts a transposition table probe
+        :param hit: if the position was in the table
+        """
+        self.table_probes += 1
+        if hit:
+            self.table_hits += 1
+
+    def report(self):
+        """
+        Gets the statistics of the search
+        :return: dictionary with the counters
+        """
+        elapsed = time.perf_counter() - self.start_time
+        return {
+            "nodes": self.nodes,
+            "nodes_per_ply": self.nodes_per_ply,
+            "nodes_per_second": round(self.nodes / elapsed) if elapsed > 0 else 0,
+            "branching_factor": round(self.moves_generated / self.interior_nodes, 2) if self.interior_nodes else 0,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": round(self.cutoff_indexes.get(0, 0) / self.cutoffs, 3) if self.cutoffs else 0,
+            "cutoff_indexes": dict(sorted(self.cutoff_indexes.items())),
+            "table_probes": self.table_probes,
+            "table_hits": self.table_hits,
+            "move_generation_time": round(self.move_generation_time, 4),
+            "evaluation_time": round(self.evaluation_time, 4),
+            "copy_time": round(self.copy_time, 4),
+            "make_move_time": round(self.make_move_time, 4),
+            "total_time": round(elapsed, 4)
+        }
+
+    def dump(self, file=sys.stdout):
+        """
+        Prints the statistics of the search
+        :param file: file to print to
+        """
+        for key, value in self.report().items():
+            print(f"{key:22} {value}", file=file)
@@ -0,0 +1,198 @@
+"""
+    SelfPlay.py
+
+    Plays AI vs AI games of Hoppers without the GUI
+    and writes the results to a JSONL file
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+
+    Usage:
+
+    python SelfPlay.py --games 100 --depth-one 2 --time-two 500 --workers 4 --output results.jsonl
+    python SelfPlay.py --games 100 --record games.jsonl.gz
+    python SelfPlay.py --games 4 --workers 1 --search-workers 4 --depth-one 4 --depth-two 4
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import io
+import json
+import random
+import time
+import AI as AI
+import BitBoard as Bb
+import GameMechanics as Mechanics
+import GameRecord as Gr
+import MoveOrdering as Mo
+import ParallelSearch as Pls
+import SearchStats as Ss
+import TranspositionTable as Tt
+
+
+def search_move(game, player, depth, time_budget, table, ordering, stats, parallel: Pls.ParallelSearch = None):
+    """
+    Searches the move of a player
+    :param game: game in play
+    :param player: player who is going to move
+    :param depth: fixed depth, or maximum depth if there is a time budget
+    :param time_budget: time budget in milliseconds, or None to search to a fixed depth
+    :param table: transposition table of the player
+    :param ordering: move ordering of the player
+    :param stats: statistics of the search
+    :param parallel: optional pool that searches the root moves of fixed depth searches in parallel
+    :return: best move
+    """
+    board = game.get_board()
+    if time_budget is not None:
+        return AI.iterative_deepening(board, player, game, time_budget, max_depth=depth, table=table,
+                                      ordering=ordering, stats=stats)[1]
+    if parallel is not None:
+        return parallel.search(board, depth, player, stats)[1]
+
+    table.new_search()
+    ordering.new_search()
+    return AI.minimax_in_place(board, depth, player, game, table=table, ordering=ordering, stats=stats)[1]
+
+
+def play_random_opening(game, plies, seed):
+    """
+    Plays random moves at the start of a game so the games of a tournament are different
+    :param game: game in play
+    :param plies: number of random moves
+    :param seed: random seed of the game
+    :return: player who moves next
+    """
+    generator = random.Random(seed)
+    player = 1
+    for _ in range(plies):
+        moves = AI.get_move_list(game.get_board(), player)
+        move = generator.choice(moves)
+        game.make_move(list(move[0]), list(move[1]), player)
+        player = 3 - player
+    return player
+
+
+def play_game(game_index, settings):
+    """
+    Plays a game between two AI players
+    :param game_index: number of the game in the tournament
+    :param settings: dictionary with the depth and time budget of each player, the random opening plies,
+                     the seed, the maximum number of moves and the processes of the parallel search
+    :return: dictionary with the result of the game and its game record line
+    """
+    if settings["search_workers"]:
+        with Pls.ParallelSearch(settings["search_workers"], settings["table_size"]) as parallel:
+            return play_game_with(game_index, settings, parallel)
+    return play_game_with(game_index, settings)
+
+
+def play_game_with(game_index, settings, parallel: Pls.ParallelSearch = None):
+    """
+    Plays a game between two AI players
+    :param game_index: number of the game in the tournament
+    :param settings: settings of the game (see play_game)
+    :param parallel: optional pool that searches the root moves of fixed depth searches
+    :return: dictionary with the result of the game and its game record line
+    """
+    record = io.StringIO()
+    writer = Gr.GameWriter(record, {"game": game_index, "depth": settings["depth"][1:], "time": settings["time"][1:]})
+    game = Mechanics.Hoppers(Bb.BitBoard, writer)
+    tables = [None, Tt.TranspositionTable(settings["table_size"]), Tt.TranspositionTable(settings["table_size"])]
+    orderings = [None, Mo.MoveOrdering(), Mo.MoveOrdering()]
+    player = play_random_opening(game, settings["random_plies"], settings["seed"] + game_index)
+
+    moves = []
+    winner = game.check_win()
+    while winner is None and len(moves) < settings["max_moves"]:
+        stats = Ss.SearchStats()
+        start = time.perf_counter()
+        move = search_move(game, player, settings["depth"][player], settings["time"][player], tables[player],
+                           orderings[player], stats, parallel)
+        elapsed = time.perf_counter() - start
+
+        valid, path = game.make_move(list(move[0]), list(move[1]), player)
+        if not valid:
+            raise RuntimeError(f"Player {player} chose an invalid move: {move}")
+        moves.append({"player": player, "move": move, "nodes": stats.nodes, "time_ms": round(elapsed * 1000, 3)})
+        winner = game.check_win()
+        player = 3 - player
+
+    if writer.moves:
+        writer.finish_game(None)
+    return {
+        "game": game_index,
+        "winner": winner,
+        "moves": len(moves),
+        "nodes": [sum(move["nodes"] for move in moves if move["player"] == player) for player in (1, 2)],
+        "time_per_move_ms": [move["time_ms"] for move in moves],
+        "nodes_per_move": [move["nodes"] for move in moves],
+        "record": record.getvalue()
+    }
+
+
+def run_tournament(games, settings, workers=None):
+    """
+    Plays several games in parallel
+    :param games: number of games
+    :param settings: settings of the games (see play_game)
+    :param workers: number of processes (all the cores if not given)
+    :return: generator with the result of every game, in the order they finish
+    """
+    with ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(play_game, game_index, settings) for game_index in range(games)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main():
+    """
+    Runs a tournament from the command line
+    """
+    parser = argparse.ArgumentParser(description="Plays AI vs AI games of Hoppers")
+    parser.add_argument("--games", type=int, default=10, help="number of games")
+    parser.add_argument("--workers", type=int, default=None, help="number of processes (default: all the cores)")
+    parser.add_argument("--output", default="selfplay.jsonl", help="JSONL file the results are appended to")
+    parser.add_argument("--depth-one", type=int, default=2, help="depth (or maximum depth) of player one")
+    parser.add_argument("--depth-two", type=int, default=2, help="depth (or maximum depth) of player two")
+    parser.add_argument("--time-one", type=int, default=None, help="time budget of player one in milliseconds")
+    parser.add_argument("--time-two", type=int, default=None, help="time budget of player two in milliseconds")
+    parser.add_argument("--random-plies", type=int, default=4, help="random moves at the start of every game")
+    parser.add_argument("--max-moves", type=int, default=400, help="moves before a game is declared a draw")
+    parser.add_argument("--table-size", type=int, default=2 ** 16, help="transposition table entries per player")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random openings")
+    parser.add_argument("--search-workers", type=int, default=None,
+                        help="processes that search the root moves of fixed depth players in parallel (per game)")
+    parser.add_argument("--record", default=None, help="game record file the moves are appended to (.gz to compress)")
+    arguments = parser.parse_args()
+
+    settings = {
+        "depth": [None, arguments.depth_one, arguments.depth_two],
+        "time": [None, arguments.time_one, arguments.time_two],
+        "random_plies": arguments.random_plies,
+        "max_moves": arguments.max_moves,
+        "table_size": arguments.table_size,
+        "seed": arguments.seed,
+        "search_workers": arguments.search_workers
+    }
+    wins = [0, 0, 0]
+    records = Gr.open_archive(arguments.record, "a") if arguments.record else None
+    with open(arguments.output, "a") as output:
+        for result in run_tournament(arguments.games, settings, arguments.workers):
+            record = result.pop("record")
+            if records is not None:
+                records.write(record)
+                records.flush()
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+            wins[result["winner"] or 0] += 1
+            print(f"Partida {result['game']}: ganador {result['winner']} en {result['moves']} movimientos")
+
+    if records is not None:
+        records.close()
+    print(f"Jugador 1: {wins[1]}  Jugador 2: {wins[2]}  Empates: {wins[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+    Tablebase.py
+
+    Endgame tablebase of the AI: the number of moves a player needs to fill
+    its goal triangle when at most K of its pieces are still outside of it.
+    It is built offline with a retrograde breadth first search and probed
+    from a memory mapped file at the leaves of the search
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+
+    Usage:
+
+    python Tablebase.py --pieces 2 --output endgame_tablebase.bin
+"""
+
+from math import comb
+import argparse
+import mmap
+import struct
+import time
+import BitBoard as Bb
+
+MAGIC = b"HOPT"
+VERSION = 1
+# Magic, version, maximum pieces outside of the goal
+HEADER = struct.Struct("<4sBB")
+UNKNOWN = 255
+PIECES = 15
+# Score of a won race, minus the moves the winner needs (far above any evaluation of Board.evaluate)
+TABLEBASE_WIN = 1000.0
+
+# Positions are stored for player one, the squares of player two are mirrored (row, column) -> (9 - row, 9 - column)
+GOAL_MASK = Bb.GOAL_MASKS[1]
+GOAL_SQUARES = Bb.mask_indexes(GOAL_MASK)
+OUTSIDE_SQUARES = [square for square in range(Bb.SQUARES) if not GOAL_MASK >> square & 1]
+SQUARE_RANKS = [GOAL_SQUARES.index(square) if GOAL_MASK >> square & 1 else OUTSIDE_SQUARES.index(square)
+                for square in range(Bb.SQUARES)]
+
+
+def table_offsets(pieces):
+    """
+    Gets where the positions with each number of pieces outside of the goal start in the table
+    :param pieces: maximum pieces outside of the goal
+    :return: list with the offset of 0 to pieces outside pieces, and the size of the table at the end
+    """
+    offsets = [0]
+    for outside in range(pieces + 1):
+        offsets.append(offsets[-1] + comb(len(GOAL_SQUARES), outside) * comb(len(OUTSIDE_SQUARES), outside))
+    return offsets
+
+
+def combination_rank(squares):
+    """
+    Gets the rank of a set of squares in the combinatorial number system
+    :param squares: ascending list with the squares
+    :return: rank among the sets with the same size
+    """
+    return sum(comb(SQUARE_RANKS[square], count + 1) for count, square in enumerate(squares))
+
+
+def table_index(mask, offsets):
+    """
+    Gets the index of a position of player one in the table
+    :param mask: pieces of player one
+    :param offsets: offsets returned by table_offsets
+    :return: index, or None if too many pieces are outside of the goal
+    """
+    outside = Bb.mask_indexes(mask & ~GOAL_MASK)
+    if len(outside) >= len(offsets) - 1:
+        return None
+    empty = Bb.mask_indexes(GOAL_MASK & ~mask)
+    return offsets[len(outside)] + combination_rank(empty) * comb(len(OUTSIDE_SQUARES), len(outside)) + \
+        combination_rank(outside)
+
+
+def mirror_mask(mask):
+    """
+    Mirrors the pieces of player two onto the goal of player one
+    :param mask: pieces of player two
+    :return: mirrored mask
+    """
+    return int(format(mask, f"0{Bb.SQUARES}b")[::-1], 2)
+
+
+class Tablebase:
+    """
+    Memory mapped endgame tablebase
+    """
+    def __init__(self, path):
+        """
+        Opens a tablebase written by build_tablebase
+        :param path: path of the file
+        """
+        with open(path, "rb") as table_file:
+            self.data = mmap.mmap(table_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.pieces = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError(f"{path} is not an endgame tablebase (version {VERSION})")
+        self.offsets = table_offsets(self.pieces)
+
+    def close(self):
+        """
+        Closes the file of the tablebase
+        """
+        self.data.close()
+
+    def distance(self, board, player):
+        """
+        Gets the moves a player needs to fill its goal, ignoring the pieces of the opponent
+        :param board: board position
+        :param player: player one or two
+        :return: number of moves, or None if the position is not in the tablebase
+        """
+        # Opponent pieces inside the goal or too many pieces outside of it
+        if board.goal_pieces[player] + board.goal_empty[player] != PIECES or \
+                board.goal_pieces[player] < PIECES - self.pieces:
+            return None
+
+        mask = Bb.board_masks(board)[player - 1]
+        if player == 2:
+            mask = mirror_mask(mask)
+        distance = self.data[HEADER.size + table_index(mask, self.offsets)]
+        return None if distance == UNKNOWN else distance
+
+    def in_reach(self, board):
+        """
+        Checks if a position one move away can be in the tablebase (a move adds at most one piece to a goal)
+        :param board: board position
+        :return: False if no move reaches the tablebase
+        """
+        return any(board.goal_pieces[player] + 1 >= PIECES - self.pieces for player in (1, 2))
+
+    def score(self, board, player):
+        """
+        Scores a position as a race to fill the goals. A player that is not in the tablebase needs
+        at least one move for every empty square of its goal
+        :param board: board position
+        :param player: player who is going to move
+        :return: score from the point of view of player one, or None if the race is not decided
+        """
+        distances = [None, self.distance(board, 1), self.distance(board, 2)]
+        if distances[1] is None and distances[2] is None:
+            return None
+
+        bounds = [None] + [distances[side] if distances[side] is not None else board.goal_empty[side]
+                           for side in (1, 2)]
+        opponent = 3 - player
+        # The player who moves first wins a tied race
+        if distances[player] is not None and distances[player] <= bounds[opponent]:
+            winner = player
+        elif distances[opponent] is not None and distances[opponent] < bounds[player]:
+            winner = opponent
+        else:
+            return None
+        return TABLEBASE_WIN - distances[winner] if winner == 1 else distances[winner] - TABLEBASE_WIN
+
+
+def build_tablebase(pieces):
+    """
+    Solves every position of player one with at most a number of pieces outside of the goal.
+    Moves can always be taken back, so a breadth first search from the filled goal
+    finds the fewest moves that fill it from each position
+    :param pieces: maximum pieces outside of the goal
+    :return: bytearray with the distance of every position (UNKNOWN if the goal can not be filled)
+    """
+    offsets = table_offsets(pieces)
+    distances = bytearray([UNKNOWN]) * offsets[-1]
+    distances[table_index(GOAL_MASK, offsets)] = 0
+    board = Bb.BitBoard.from_masks(0, 0)
+
+    frontier = [GOAL_MASK]
+    distance = 0
+    while frontier and distance + 1 < UNKNOWN:
+        next_frontier = []
+        for mask in frontier:
+            board.bitboards[1] = mask
+            for origin in Bb.mask_indexes(mask):
+                for destination in Bb.mask_indexes(board.reachable_mask(origin)):
+                    child = mask ^ (1 << origin | 1 << destination)
+                    index = table_index(child, offsets)
+                    if index is not None and distances[index] == UNKNOWN:
+                        distances[index] = distance + 1
+                        next_frontier.append(child)
+        frontier = next_frontier
+        distance += 1
+        print(f"Distancia {distance}: {len(frontier)} posiciones")
+    return distances
+
+
+def save_tablebase(path, pieces, distances):
+    """
+    Writes a tablebase to a binary file
+    :param path: path of the file
+    :param pieces: maximum pieces outside of the goal
+    :param distances: distances returned by build_tablebase
+    """
+    with open(path, "wb") as table_file:
+        table_file.write(HEADER.pack(MAGIC, VERSION, pieces))
+        table_file.write(distances)
+
+
+def main():
+    """
+    Builds an endgame tablebase from the command line
+    """
+    parser = argparse.ArgumentParser(description="Builds the endgame tablebase of the AI")
+    parser.add_argument("--pieces", type=int, default=2, help="maximum pieces outside of the goal")
+    parser.add_argument("--output", default="endgame_tablebase.bin", help="file the tablebase is written to")
+    arguments = parser.parse_args()
+
+    start = time.perf_counter()
+    distances = build_tablebase(arguments.pieces)
+    save_tablebase(arguments.output, arguments.pieces, distances)
+    solved = len(distances) - distances.count(UNKNOWN)
+    print(f"{solved} de {len(distances)} posiciones resueltas en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
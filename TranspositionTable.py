@@ -0,0 +1,111 @@
+"""
+    TranspositionTable.py
+
+    Bounded transposition table used by the AI to remember
+    positions it has already analyzed
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+from collections import namedtuple
+
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+TableEntry = namedtuple("TableEntry", ["key", "depth", "score", "bound", "best_move", "generation"])
+
+
+class TranspositionTable:
+    """
+    Fixed size table indexed by the low bits of the Zobrist key of a position
+    """
+    def __init__(self, size=2 ** 18, replacement="depth"):
+        """
+        Initializes the table
+        :param size: maximum number of entries
+        :param replacement: "depth" keeps the deeper entry of the current search, "always" keeps the newest one
+        """
+        if replacement not in ("depth", "always"):
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+        self.size = size
+        self.replacement = replacement
+        self.entries = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def new_search(self):
+        """
+        Marks the start of a new search so entries of older searches can be replaced
+        """
+        self.generation += 1
+
+    def probe(self, key):
+        """
+        Looks up a position
+        :param key: Zobrist key of the position
+        :return: the entry of the position, or None
+        """
+        entry = self.entries[key % self.size]
+        if entry is None:
+            self.misses += 1
+            return None
+        elif entry.key != key:
+            self.collisions += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def peek(self, key):
+        """
+        Looks up a position without updating the counters
+        :param key: Zobrist key of the position
+        :return: the entry of the position, or None
+        """
+        entry = self.entries[key % self.size]
+        if entry is None or entry.key != key:
+            return None
+        return entry
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Stores the result of a search following the replacement policy
+        :param key: Zobrist key of the position
+        :param depth: depth the position was searched to
+        :param score: score of the position
+        :param bound: EXACT, LOWER_BOUND or UPPER_BOUND
+        :param best_move: best move found in the position
+        """
+        index = key % self.size
+        entry = self.entries[index]
+        if self.replacement == "depth" and entry is not None and entry.key != key and \
+                entry.generation == self.generation and entry.depth > depth:
+            return
+        self.entries[index] = TableEntry(key, depth, score, bound, best_move, self.generation)
+
+    def clear(self):
+        """
+        Removes every entry and resets the counters
+        """
+        self.entries = [None] * self.size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+
+    def get_stats(self):
+        """
+        Gets the usage counters of the table
+        :return: dictionary with the hits, misses, collisions and used entries
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "used": self.size - self.entries.count(None),
+            "size": self.size
+        }
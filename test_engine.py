@@ -0,0 +1,482 @@
+"""
+    test_engine.py
+
+    Tests of the move generators, the incremental evaluation, the searches
+    and the game history. Run with: python -m pytest
+
+    Pablo Ruiz 18259 (PingMaster99)
+    Version 1.0
+    Updated October 18, 2026
+"""
+
+import io
+import json
+import pickle
+import random
+import threading
+import time
+import pytest
+import AI as AI
+import AIWorker as Worker
+import Analysis as An
+import BatchEvaluation as Be
+import Benchmark as Bench
+import BitBoard as Bb
+import Board as Bd
+import GameMechanics as Mechanics
+import GameRecord as Gr
+import MoveOrdering as Mo
+import OpeningBook as Ob
+import ParallelSearch as Pls
+import Perft as Perft
+import Position as Ps
+import Tablebase as Tb
+import TranspositionTable as Tt
+
+BACKENDS = [Bd.Board, Bb.BitBoard]
+SEARCH_CASES = [(position, player, depth) for position in Bench.POSITIONS for player in (1, 2) for depth in (1, 2, 3)]
+
+
+def random_grid(generator, pieces=15):
+    """
+    Places the pieces of both players on random squares
+    :param generator: random generator
+    :param pieces: pieces of each player
+    :return: 10x10 list with the pieces
+    """
+    grid = [[0] * 10 for _ in range(10)]
+    squares = generator.sample(range(100), 2 * pieces)
+    for number, square in enumerate(squares):
+        grid[square // 10][square % 10] = 1 if number < pieces else 2
+    return grid
+
+
+def tracking(board):
+    """
+    Gets the terms that the boards keep up to date after every move
+    :param board: board of any backend
+    :return: tuple with the hash and the evaluation terms
+    """
+    return board.hash_key, board.distance_sums, board.goal_empty, board.goal_pieces
+
+
+@pytest.mark.parametrize("board_class", BACKENDS)
+def test_flood_fill_matches_reference_generator(board_class):
+    generator = random.Random(1)
+    for _ in range(40):
+        grid = random_grid(generator, generator.randint(5, 20))
+        board = board_class.from_grid(grid)
+        reference = Perft.ReferenceBoard.from_grid(grid)
+        for player in (1, 2):
+            for piece in board.get_pieces(player):
+                assert sorted(board.get_valid_moves(piece)) == sorted(reference.get_valid_moves(piece)), piece
+
+
+def test_board_from_grid_tracks_the_grid_once(monkeypatch):
+    passes = []
+    update_tracking = Bd.Board.update_tracking
+    monkeypatch.setattr(Bd.Board, "update_tracking", lambda board: passes.append(board) or update_tracking(board))
+    grid = random_grid(random.Random(9))
+    board = Bd.Board.from_grid(grid)
+    assert len(passes) == 1
+    assert board.board == grid and board.board is not grid
+    assert tracking(board) == tracking(Bb.BitBoard.from_grid(grid))
+
+
+def test_bitboard_zone_spaces_match_board():
+    generator = random.Random(6)
+    for _ in range(40):
+        grid = random_grid(generator, generator.randint(5, 20))
+        board = Bd.Board.from_grid(grid)
+        bitboard = Bb.BitBoard.from_grid(grid)
+        assert bitboard.spaces_in_zone_one() == board.spaces_in_zone_one()
+        assert bitboard.spaces_in_zone_two() == board.spaces_in_zone_two()
+
+
+@pytest.mark.parametrize("board_class", BACKENDS)
+def test_incremental_evaluation_matches_rescan(board_class):
+    generator = random.Random(2)
+    board = board_class.from_grid(random_grid(generator))
+    undos = []
+    player = 1
+    for _ in range(150):
+        if undos and generator.random() < 0.3:
+            AI.undo_move(board, undos.pop())
+        else:
+            undos.append(AI.apply_move(board, generator.choice(AI.get_move_list(board, player)), player))
+        player = 3 - player
+        rescanned = board_class.from_grid(board.board)
+        assert tracking(board) == tracking(rescanned)
+        assert board.evaluate() == rescanned.evaluate()
+
+    while undos:
+        AI.undo_move(board, undos.pop())
+    assert tracking(board) == tracking(board_class.from_grid(board.board))
+
+
+def move_evaluations(board, moves, player):
+    """
+    Evaluates the board after every move by making it
+    :param board: board position
+    :param moves: list of (initial coordinate, final coordinate) tuples
+    :param player: player who makes the moves
+    :return: list with the valuations
+    """
+    evaluations = []
+    for move in moves:
+        undo = AI.apply_move(board, move, player)
+        evaluations.append(board.evaluate())
+        AI.undo_move(board, undo)
+    return evaluations
+
+
+@pytest.mark.parametrize("position", list(Bench.POSITIONS))
+def test_batch_evaluation_fallback_matches_moves(position, monkeypatch):
+    monkeypatch.setattr(Be, "np", None)
+    monkeypatch.setattr(Be, "numpy_loaded", True)
+    board = Bench.build_board(Bb.BitBoard, Bench.POSITIONS[position])
+    for player in (1, 2):
+        moves = AI.get_move_list(board, player)
+        assert Be.evaluate_moves(board, moves, player) == move_evaluations(board, moves, player)
+
+
+@pytest.mark.parametrize("position", list(Bench.POSITIONS))
+def test_numpy_batch_evaluation_matches_moves(position, monkeypatch):
+    pytest.importorskip("numpy")
+    assert Be.load_numpy() and Be.np is not None
+    board = Bench.build_board(Bb.BitBoard, Bench.POSITIONS[position])
+    for player in (1, 2):
+        moves = AI.get_move_list(board, player)
+        expected = move_evaluations(board, moves, player)
+        # The whole batch is scored with array operations, no move is made on the board
+        with monkeypatch.context() as patch:
+            patch.setattr(board, "apply_move", lambda *args: pytest.fail("move made on the board"))
+            assert Be.evaluate_moves(board, moves, player) == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize("position, player, depth", SEARCH_CASES)
+def test_transposition_table_keeps_minimax_scores(position, player, depth):
+    board = Bench.build_board(Bb.BitBoard, Bench.POSITIONS[position])
+    expected = AI.minimax(board, depth, player, None)[0]
+    score = AI.minimax_in_place(board, depth, player, None, table=Tt.TranspositionTable(2 ** 14),
+                                ordering=Mo.MoveOrdering())[0]
+    assert score == expected
+    assert Bb.board_masks(board) == Bb.grid_masks(Bench.POSITIONS[position])
+
+
+@pytest.mark.parametrize("position, player, depth", SEARCH_CASES)
+def test_principal_variation_search_matches_minimax(position, player, depth):
+    board = Bench.build_board(Bb.BitBoard, Bench.POSITIONS[position])
+    expected = AI.minimax_in_place(board, depth, player, None, table=Tt.TranspositionTable(2 ** 14),
+                                   ordering=Mo.MoveOrdering())[0]
+    score, variation = AI.principal_variation_search(board, depth, player, None,
+                                                     table=Tt.TranspositionTable(2 ** 14),
+                                                     ordering=Mo.MoveOrdering())
+    assert (score if player == 1 else -score) == expected
+    assert variation[0] in AI.get_move_list(board, player)
+    assert Bb.board_masks(board) == Bb.grid_masks(Bench.POSITIONS[position])
+
+
+def test_parallel_search_matches_minimax():
+    with Pls.ParallelSearch(workers=2, table_size=2 ** 12) as search:
+        for position in Bench.POSITIONS:
+            for player, depth in ((1, 1), (2, 2), (1, 3)):
+                board = Bench.build_board(Bb.BitBoard, Bench.POSITIONS[position])
+                expected = AI.minimax_in_place(board, depth, player, None)[0]
+                score, move = search.search(board, depth, player)
+                assert score == expected, (position, player, depth)
+                assert move in AI.get_move_list(board, player)
+
+
+@pytest.mark.parametrize("position", list(Bench.POSITIONS))
+def test_aspiration_windows_keep_the_score(position):
+    board = Bench.build_board(Bb.BitBoard, Bench.POSITIONS[position])
+    expected = AI.minimax_in_place(board, 3, 1, None)[0]
+    score, move, depth = AI.iterative_deepening(board, 1, None, 10 ** 6, max_depth=3, pvs=True)
+    assert depth == 3 or score == float('inf')
+    if depth == 3:
+        assert score == expected
+
+
+@pytest.mark.parametrize("pvs", [False, True])
+def test_cancelled_search_stops(pvs):
+    board = Bb.BitBoard()
+    cancelled = threading.Event()
+    cancelled.set()
+    assert AI.iterative_deepening(board, 1, None, 10 ** 6, pvs=pvs, cancelled=cancelled)[1:] == (None, 0)
+    assert Bb.board_masks(board) == Bb.board_masks(Bb.BitBoard())
+
+
+@pytest.mark.parametrize("board_class", BACKENDS)
+def test_undo_redo_and_replay(board_class):
+    generator = random.Random(3)
+    game = Mechanics.Hoppers(board_class)
+    start = tracking(game.get_board())
+    player = 1
+    for _ in range(30):
+        move = generator.choice(AI.get_move_list(game.get_board(), player))
+        assert game.make_move(list(move[0]), list(move[1]), player)[0]
+        player = 3 - player
+    played = game.get_board().board
+    history = list(game.history)
+
+    while game.undo_move() is not None:
+        pass
+    assert tracking(game.get_board()) == start
+    while game.redo_move() is not None:
+        pass
+    assert game.get_board().board == played
+    assert game.history == history
+
+    game.replay(history)
+    assert game.get_board().board == played
+
+
+def test_written_game_can_not_be_taken_back():
+    record = io.StringIO()
+    game = Mechanics.Hoppers(Bb.BitBoard, Gr.GameWriter(record))
+    game.board = Bb.BitBoard.from_masks(Bb.GOAL_MASKS[1] & ~(1 << 59) | 1 << 49, Bb.GOAL_MASKS[2] & ~1 | 1 << 50)
+    game.make_move([4, 9], [5, 9], 1)
+    assert game.check_win() == 1
+    assert game.undo_move() is None
+    assert [game["moves"] for game in Gr.read_games(io.StringIO(record.getvalue()))] == [[((4, 9), (5, 9))]]
+
+
+def test_replay_does_not_write_the_game_in_play():
+    record = io.StringIO()
+    writer = Gr.GameWriter(record)
+    game = Mechanics.Hoppers(Bb.BitBoard, writer)
+    generator = random.Random(4)
+    player = 1
+    for _ in range(4):
+        move = generator.choice(AI.get_move_list(game.get_board(), player))
+        game.make_move(list(move[0]), list(move[1]), player)
+        player = 3 - player
+    history = list(game.history)
+    moves = list(writer.moves)
+
+    game.replay(history)
+    assert record.getvalue() == ""
+    assert writer.moves == moves
+    assert game.history == history
+
+
+def test_game_record_round_trip():
+    record = io.StringIO()
+    writer = Gr.GameWriter(record, {"event": "test"})
+    generator = random.Random(5)
+    board = Bb.BitBoard()
+    player = 2
+    for _ in range(20):
+        move = generator.choice(AI.get_move_list(board, player))
+        board.make_move(list(move[0]), list(move[1]), player)
+        writer.add_move(player, move)
+        player = 3 - player
+    writer.finish_game(None, round=1)
+    writer.add_move(1, ((3, 0), (4, 0)))
+    writer.finish_game(None)
+
+    games = list(Gr.read_games(io.StringIO(record.getvalue())))
+    assert [(game["event"], game.get("round"), len(game["moves"])) for game in games] == \
+           [("test", 1, 20), ("test", None, 1)]
+    assert games[0]["first_player"] == 2
+    assert Gr.check_game(games[0]) is None
+    replayed = [replayed_board.board for _, _, replayed_board in Gr.replay(games[0])][-1]
+    assert replayed == board.board
+
+    games[0]["moves"][3] = ((0, 0), (9, 9))
+    assert Gr.check_game(games[0]) == "movimiento 4 invalido: 00-99"
+
+
+@pytest.mark.parametrize("board_class", BACKENDS)
+def test_possible_moves_cache_follows_the_board(board_class):
+    game = Mechanics.Hoppers(board_class)
+    piece = [3, 1]
+    moves = game.get_possible_moves(piece)
+    assert game.get_possible_moves(piece) is moves
+    assert game.make_move([4, 0], [5, 0], 1)[0]
+    assert sorted(game.get_possible_moves(piece)) == sorted(game.get_board().get_valid_moves(piece)) != sorted(moves)
+    game.undo_move()
+    assert sorted(game.get_possible_moves(piece)) == sorted(moves)
+
+
+def test_opening_book_round_trip(tmp_path):
+    book = Ob.OpeningBook()
+    board = Bb.BitBoard()
+    book.add(board, 1, ((0, 3), (0, 5)), 0.25)
+    book.add(board, 2, ((5, 9), (4, 8)), -0.5)
+    reply = Bb.BitBoard()
+    reply.direct_move([0, 3], [0, 5], 1)
+    book.add(reply, 2, ((0, 0), (5, 5)), 1.0)
+    book.save(tmp_path / "book.bin")
+
+    loaded = Ob.OpeningBook.load(tmp_path / "book.bin")
+    assert len(loaded) == 3
+    assert loaded.lookup(Bd.Board(), 1) == (((0, 3), (0, 5)), 0.25)
+    assert loaded.lookup(board, 2) == (((5, 9), (4, 8)), -0.5)
+    # Moves that are not valid on the board are not played
+    assert loaded.lookup(reply, 2) is None
+    assert loaded.lookup(reply, 1) is None
+
+    (tmp_path / "other.bin").write_bytes(b"HOPT" + bytes(10))
+    with pytest.raises(ValueError):
+        Ob.OpeningBook.load(tmp_path / "other.bin")
+
+
+def test_tablebase_indexes_are_unique():
+    offsets = Tb.table_offsets(2)
+    indexes = {Tb.table_index(Tb.GOAL_MASK, offsets)}
+    for goal in Tb.GOAL_SQUARES:
+        for outside in Tb.OUTSIDE_SQUARES:
+            indexes.add(Tb.table_index(Tb.GOAL_MASK ^ (1 << goal | 1 << outside), offsets))
+    for goal, other_goal in zip(Tb.GOAL_SQUARES, Tb.GOAL_SQUARES[1:]):
+        for outside, other_outside in zip(Tb.OUTSIDE_SQUARES, Tb.OUTSIDE_SQUARES[3:]):
+            indexes.add(Tb.table_index(Tb.GOAL_MASK ^ (1 << goal | 1 << other_goal | 1 << outside |
+                                                       1 << other_outside), offsets))
+    assert len(indexes) == 1 + 15 * 85 + 14 * 82
+    assert all(0 <= index < offsets[-1] for index in indexes)
+    assert Tb.table_index(Tb.GOAL_MASK ^ (1 << 99 | 1 << 0 | 1 << 98 | 1 << 1 | 1 << 97 | 1 << 2), offsets) is None
+
+
+def test_tablebase_mirror_mask():
+    assert Tb.mirror_mask(Bb.GOAL_MASKS[2]) == Bb.GOAL_MASKS[1]
+    mask = 1 << Bb.square_index([2, 7]) | 1 << Bb.square_index([9, 0])
+    assert Tb.mirror_mask(mask) == 1 << Bb.square_index([7, 2]) | 1 << Bb.square_index([0, 9])
+    assert Tb.mirror_mask(Tb.mirror_mask(mask)) == mask
+
+
+def test_tablebase_scores_decided_races(tmp_path):
+    Tb.save_tablebase(tmp_path / "tablebase.bin", 1, Tb.build_tablebase(1))
+    tablebase = Tb.Tablebase(tmp_path / "tablebase.bin")
+    try:
+        # Player one fills its goal in one move, player two needs more
+        board = Bb.BitBoard.from_masks(Bb.GOAL_MASKS[1] & ~(1 << 59) | 1 << 49, Bb.GOAL_MASKS[2] & ~1 | 1 << 90)
+        assert tablebase.distance(board, 1) == 1
+        assert tablebase.distance(board, 2) > 1
+        assert tablebase.score(board, 1) == Tb.TABLEBASE_WIN - 1
+        assert tablebase.score(board, 2) == Tb.TABLEBASE_WIN - 1
+        # The same race with the players swapped
+        mirrored = Bb.BitBoard.from_masks(Tb.mirror_mask(board.bitboards[2]), Tb.mirror_mask(board.bitboards[1]))
+        assert tablebase.score(mirrored, 2) == 1 - Tb.TABLEBASE_WIN
+        # Too many pieces outside of the goals
+        assert tablebase.score(Bb.BitBoard(), 1) is None
+    finally:
+        tablebase.close()
+
+
+@pytest.mark.parametrize("board_class", BACKENDS)
+def test_position_round_trip(board_class):
+    generator = random.Random(7)
+    for _ in range(20):
+        grid = random_grid(generator, generator.randint(5, 20))
+        position = Ps.Position.from_board(board_class.from_grid(grid))
+        assert len(position.pack()) == Ps.PACKED_SIZE
+        assert Ps.Position.unpack(position.pack()) == position
+        assert pickle.loads(pickle.dumps(position)) == position
+        assert hash(Ps.Position(*Bb.grid_masks(grid))) == hash(position)
+        assert position.grid() == grid
+        board = position.to_board(board_class)
+        assert type(board) is board_class and tracking(board) == tracking(board_class.from_grid(grid))
+
+        player = generator.choice((1, 2))
+        move = generator.choice(AI.get_move_list(board, player))
+        board.direct_move(list(move[0]), list(move[1]), player)
+        assert position.apply(move[0], move[1], player) == Ps.Position.from_board(board)
+
+
+def test_analysis_keeps_the_order_of_the_positions():
+    generator = random.Random(8)
+    positions = []
+    expected = []
+    for number in range(25):
+        board = Bb.BitBoard()
+        player = 1
+        for _ in range(number):
+            move = generator.choice(AI.get_move_list(board, player))
+            board.direct_move(list(move[0]), list(move[1]), player)
+            player = 3 - player
+        positions.append((board if number % 2 else Ps.Position.from_board(board), player))
+        expected.append((Ps.Position.from_board(board), player))
+
+    results = list(An.analyse(iter(positions), 2, workers=2, chunk_size=3, max_pending=2, table_size=2 ** 12))
+    assert [(result.position, result.player) for result in results] == expected
+    for (position, player), result in zip(expected, results):
+        assert result.score == AI.minimax_in_place(position.to_board(), 2, player, None)[0]
+
+
+def finished_game_record():
+    """
+    Plays a game that fills a goal by moving the pieces straight to free goal squares
+    (not valid moves, records are replayed without checking them)
+    :return: game record line
+    """
+    record = io.StringIO()
+    writer = Gr.GameWriter(record)
+    board = Bb.BitBoard()
+    player = 1
+    outside_goals = ~(Bb.GOAL_MASKS[1] | Bb.GOAL_MASKS[2]) & (1 << Bb.SQUARES) - 1
+    while board.game_won() is None:
+        free = ~(board.bitboards[1] | board.bitboards[2])
+        destinations = Bb.mask_indexes(Bb.GOAL_MASKS[player] & free) or Bb.mask_indexes(outside_goals & free)
+        origin = Bb.mask_indexes(board.bitboards[player] & ~Bb.GOAL_MASKS[player])[0]
+        move = (Bb.SQUARE_COORDINATES[origin], Bb.SQUARE_COORDINATES[destinations[0]])
+        board.direct_move(list(move[0]), list(move[1]), player)
+        writer.add_move(player, move)
+        player = 3 - player
+    writer.finish_game(board.game_won())
+    return record.getvalue()
+
+
+def test_analysis_command_line_writes_valid_json(tmp_path, monkeypatch):
+    (tmp_path / "games.jsonl").write_text(finished_game_record())
+    monkeypatch.setattr("sys.argv", ["Analysis.py", str(tmp_path / "games.jsonl"), "--depth", "1", "--workers", "1",
+                                     "--output", str(tmp_path / "analysis.jsonl")])
+    An.main()
+
+    lines = (tmp_path / "analysis.jsonl").read_text().splitlines()
+    records = [json.loads(line, parse_constant=pytest.fail) for line in lines]
+    assert [record["ply"] for record in records] == list(range(len(records)))
+    assert records[0]["score"] is not None and records[0]["result"] is None
+    assert records[-1]["score"] is None and records[-1]["result"] == "loss"
+
+
+def test_worker_searches_a_bitboard_snapshot(monkeypatch):
+    searched = []
+    search = AI.iterative_deepening
+    monkeypatch.setattr(AI, "iterative_deepening", lambda board, *args, **kwargs:
+                        searched.append(type(board)) or search(board, *args, **kwargs))
+    worker = Worker.AIWorker()
+    board = Bench.build_board(Bd.Board, Bench.POSITIONS["midgame"])
+    worker.start(board, 2, 50)
+    result = None
+    while result is None:
+        time.sleep(0.01)
+        result = worker.get_result()
+    assert searched == [Bb.BitBoard]
+    (score, move, depth), stats, error = result
+    assert error is None and depth >= 1
+    assert list(move.destination) in board.get_valid_moves(list(move.origin))
+    assert board.board == Bench.POSITIONS["midgame"]
+
+
+@pytest.mark.parametrize("board_class", BACKENDS)
+def test_move_of_the_selected_piece_reuses_its_flood_fill(board_class, monkeypatch):
+    game = Mechanics.Hoppers(board_class)
+    game.board = Bench.build_board(board_class, Bench.POSITIONS["midgame"])
+    fills = []
+    explore_moves = game.board.explore_moves
+    monkeypatch.setattr(game.board, "explore_moves", lambda piece: fills.append(piece) or explore_moves(piece))
+
+    for piece in game.board.get_pieces(1):
+        assert game.get_possible_moves(piece) == game.board.get_valid_moves(piece)
+    piece = max(game.board.get_pieces(1), key=lambda piece: len(game.get_possible_moves(piece)))
+    final = game.get_possible_moves(piece)[-1]
+    record = game.board.get_move_record(piece, final)
+    fills.clear()
+
+    assert not game.make_move(piece, piece, 1)[0]
+    assert not game.make_move(piece, final, 2)[0]
+    valid, path = game.make_move(piece, final, 1)
+    assert valid and tuple(tuple(coordinate) for coordinate in path) == record.path
+    assert fills == []
+    assert game.history[-1][1] == record